@@ -1,10 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from src.api.projects import router as projects_router
 from src.api.crawl import router as crawl_router
 from src.api.entities import router as entities_router
 
-app = FastAPI(title="AEO Booster API", version="1.0.0")
+app = FastAPI(
+    title="AEO Booster API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # Serialize responses with orjson
+)
 
 # Configure CORS
 app.add_middleware(
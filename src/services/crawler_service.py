@@ -1,16 +1,18 @@
 """
-Website crawler service with Playwright primary engine and BeautifulSoup fallback.
+Website crawler service with Playwright primary engine and static HTML fallback.
 """
 import asyncio
 import logging
 import re
 import time
+from functools import lru_cache
 from typing import Dict, List, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
 
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import lxml.html
+from selectolax.lexbor import LexborHTMLParser
 from playwright.async_api import async_playwright, Page, Browser, TimeoutError
 
 from .content_extractor import ContentExtractor
@@ -18,27 +20,76 @@ from .page_classifier import PageClassifier
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = 'Mozilla/5.0 (compatible; AEOBooster/1.0; +https://aeobooster.com)'
+
+# Paths of files that are unlikely to be web pages
+_SKIP_EXT_RE = re.compile(
+    r'\.(?:pdf|zip|png|jpe?g|gif|svg|mp4|css|js|xml|ico|woff2?|docx?)(?:\?|$)', re.IGNORECASE
+)
+_ALLOWED_SCHEMES = frozenset({'http', 'https'})
+
+@lru_cache(maxsize=4096)
+def _normalize_url(url: str) -> Optional[str]:
+    """
+    Normalize URL by removing fragments.
+    
+    Cached because the same links (navigation menus, footers) repeat on
+    nearly every page of a site.
+    """
+    try:
+        parsed = urlparse(url.strip())
+        
+        # Basic validation
+        if not parsed.netloc or parsed.scheme not in _ALLOWED_SCHEMES:
+            return None
+        
+        # Remove fragment
+        return urlunparse((
+            parsed.scheme,
+            parsed.netloc.lower(),
+            parsed.path,
+            parsed.params,
+            parsed.query,
+            ''  # Remove fragment
+        ))
+        
+    except Exception:
+        return None
+
 class CrawlerService:
-    """Main crawler service with Playwright and BeautifulSoup engines."""
+    """Main crawler service with Playwright and static HTML engines."""
     
     def __init__(self, 
                  max_pages: int = 50,
                  delay_seconds: float = 1.0,
                  timeout_seconds: int = 30,
-                 respect_robots: bool = True):
+                 respect_robots: bool = True,
+                 use_lexbor: bool = True,
+                 max_concurrency: int = 8):
         """
         Initialize crawler service.
         
         Args:
             max_pages: Maximum number of pages to crawl
-            delay_seconds: Delay between requests
+            delay_seconds: Delay between requests. The fallback crawler fetches
+                in concurrent batches and then waits delay_seconds per page in
+                the batch, keeping the same average request rate per host
             timeout_seconds: Request timeout
             respect_robots: Whether to respect robots.txt
+            use_lexbor: Parse fallback-crawled pages with selectolax's Lexbor
+                engine instead of lxml
+            max_concurrency: Maximum concurrent requests per host in the
+                fallback crawler
         """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        
         self.max_pages = max_pages
         self.delay_seconds = delay_seconds
         self.timeout_seconds = timeout_seconds
         self.respect_robots = respect_robots
+        self.use_lexbor = use_lexbor
+        self.max_concurrency = max_concurrency
         
         self.content_extractor = ContentExtractor()
         self.page_classifier = PageClassifier()
@@ -46,7 +97,8 @@ class CrawlerService:
         # Track crawled URLs to avoid duplicates
         self.crawled_urls: Set[str] = set()
         self.failed_urls: Set[str] = set()
-        self.robots_cache: Dict[str, RobotFileParser] = {}
+        self.robots_cache: Dict[str, Optional[RobotFileParser]] = {}
+        self._robots_locks: Dict[str, asyncio.Lock] = {}
         
     async def crawl_website(self, 
                            project_id: str, 
@@ -100,9 +152,9 @@ class CrawlerService:
                     await browser.close()
                     
         except Exception as e:
-            logger.error(f"Playwright crawling failed, trying BeautifulSoup fallback: {e}")
-            # Fallback to BeautifulSoup
-            results = await self._crawl_with_beautifulsoup(
+            logger.error(f"Playwright crawling failed, trying static HTML fallback: {e}")
+            # Fallback to plain HTTP fetching
+            results = await self._crawl_static(
                 normalized_url, project_id, crawl_results, progress_callback
             )
             crawl_results.update(results)
@@ -213,88 +265,123 @@ class CrawlerService:
             
         return crawl_results
     
-    async def _crawl_with_beautifulsoup(self, 
-                                      base_url: str, 
-                                      project_id: str,
-                                      crawl_results: Dict,
-                                      progress_callback) -> Dict:
-        """Fallback crawling with BeautifulSoup for static content."""
+    async def _crawl_static(self, 
+                           base_url: str, 
+                           project_id: str,
+                           crawl_results: Dict,
+                           progress_callback) -> Dict:
+        """Fallback crawling for static content, fetching pages in concurrent batches."""
         
         urls_to_crawl = [base_url]
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; AEOBooster/1.0; +https://aeobooster.com)'
-        })
+        connector = aiohttp.TCPConnector(limit_per_host=self.max_concurrency, ttl_dns_cache=300)
         
-        while urls_to_crawl and crawl_results['pages_crawled'] < self.max_pages:
-            current_url = urls_to_crawl.pop(0)
-            
-            if current_url in self.crawled_urls or current_url in self.failed_urls:
-                continue
-            
-            # Check robots.txt
-            if self.respect_robots and not self._can_fetch_url(current_url):
-                continue
-            
-            try:
-                response = session.get(current_url, timeout=self.timeout_seconds)
-                response.raise_for_status()
-                
-                # Extract and classify content
-                extracted_content = self.content_extractor.extract_content(response.text, current_url)
-                page_type, confidence = self.page_classifier.classify_page(
-                    current_url, extracted_content['title'], extracted_content['content']
-                )
-                
-                # Store crawled page data
-                page_data = {
-                    'url': current_url,
-                    'title': extracted_content['title'],
-                    'page_type': page_type,
-                    'confidence_score': confidence,
-                    'content': extracted_content,
-                    'status': 'crawled',
-                    'crawled_at': time.time()
-                }
-                
-                crawl_results['crawled_pages'].append(page_data)
-                self.crawled_urls.add(current_url)
-                crawl_results['pages_crawled'] += 1
-                
-                # Find more URLs to crawl
-                soup = BeautifulSoup(response.text, 'html.parser')
-                new_urls = self._extract_urls_from_soup(soup, base_url)
-                for url in new_urls:
-                    if (url not in self.crawled_urls and 
-                        url not in self.failed_urls and 
-                        url not in urls_to_crawl):
-                        urls_to_crawl.append(url)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            headers={'User-Agent': USER_AGENT},
+            timeout=aiohttp.ClientTimeout(total=self.timeout_seconds)
+        ) as session:
+            while urls_to_crawl and crawl_results['pages_crawled'] < self.max_pages:
+                # Pop the next batch of crawlable URLs, never exceeding max_pages
+                batch_size = min(self.max_concurrency, self.max_pages - crawl_results['pages_crawled'])
+                batch = []
+                while urls_to_crawl and len(batch) < batch_size:
+                    current_url = urls_to_crawl.pop(0)
+                    
+                    if current_url in self.crawled_urls or current_url in self.failed_urls:
+                        continue
+                    
+                    # Check robots.txt
+                    if self.respect_robots and not await self._can_fetch_url_async(session, current_url):
+                        continue
+                    
+                    batch.append(current_url)
                 
-                crawl_results['total_pages_found'] = len(urls_to_crawl) + crawl_results['pages_crawled']
+                if not batch:
+                    break
                 
-                # Progress callback
-                if progress_callback:
-                    await progress_callback({
-                        'current_url': current_url,
-                        'pages_crawled': crawl_results['pages_crawled'],
-                        'pages_found': crawl_results['total_pages_found']
-                    })
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(self._fetch_html(session, url)) for url in batch]
                 
-                # Respectful delay
-                await asyncio.sleep(self.delay_seconds)
+                for current_url, task in zip(batch, tasks):
+                    html, error = task.result()
+                    
+                    if error is not None:
+                        logger.error(f"Error crawling {current_url}: {error}")
+                        self.failed_urls.add(current_url)
+                        crawl_results['failed_pages'].append({
+                            'url': current_url, 
+                            'error': error,
+                            'failed_at': time.time()
+                        })
+                        crawl_results['pages_failed'] += 1
+                        continue
+                    
+                    # Extract and classify content
+                    extracted_content = self.content_extractor.extract_content(html, current_url)
+                    page_type, confidence = self.page_classifier.classify_page(
+                        current_url, extracted_content['title'], extracted_content['content']
+                    )
+                    
+                    # Store crawled page data
+                    page_data = {
+                        'url': current_url,
+                        'title': extracted_content['title'],
+                        'page_type': page_type,
+                        'confidence_score': confidence,
+                        'content': extracted_content,
+                        'status': 'crawled',
+                        'crawled_at': time.time()
+                    }
+                    
+                    crawl_results['crawled_pages'].append(page_data)
+                    self.crawled_urls.add(current_url)
+                    crawl_results['pages_crawled'] += 1
+                    
+                    # Find more URLs to crawl
+                    new_urls = self._extract_urls_from_html(html, base_url)
+                    for url in new_urls:
+                        if (url not in self.crawled_urls and 
+                            url not in self.failed_urls and 
+                            url not in urls_to_crawl and
+                            url not in batch):
+                            urls_to_crawl.append(url)
+                    
+                    crawl_results['total_pages_found'] = len(urls_to_crawl) + crawl_results['pages_crawled']
+                    
+                    # Progress callback
+                    if progress_callback:
+                        await progress_callback({
+                            'current_url': current_url,
+                            'pages_crawled': crawl_results['pages_crawled'],
+                            'pages_found': crawl_results['total_pages_found']
+                        })
                 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Error crawling {current_url}: {e}")
-                self.failed_urls.add(current_url)
-                crawl_results['failed_pages'].append({
-                    'url': current_url, 
-                    'error': str(e),
-                    'failed_at': time.time()
-                })
-                crawl_results['pages_failed'] += 1
+                # Respectful delay, scaled so a batch of pages averages one
+                # request per delay_seconds like sequential crawling
+                await asyncio.sleep(self.delay_seconds * len(batch))
         
         return crawl_results
     
+    async def _fetch_html(self, session: aiohttp.ClientSession, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Fetch a page body.
+        
+        Errors are returned rather than raised so that one failing URL does
+        not cancel the rest of its TaskGroup batch.
+        
+        Returns:
+            Tuple of (html, error); exactly one of them is None
+        """
+        try:
+            response = await session.get(url)
+            try:
+                response.raise_for_status()
+                return await response.text(), None
+            finally:
+                response.release()
+        except Exception as e:
+            return None, str(e) or e.__class__.__name__
+    
     async def _extract_urls_from_page(self, page: Page, base_url: str) -> List[str]:
         """Extract URLs from a Playwright page."""
         try:
@@ -305,71 +392,67 @@ class CrawlerService:
             logger.error(f"Error extracting URLs from page: {e}")
             return []
     
-    def _extract_urls_from_soup(self, soup: BeautifulSoup, base_url: str) -> List[str]:
-        """Extract URLs from BeautifulSoup parsed content."""
-        links = []
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            absolute_url = urljoin(base_url, href)
-            links.append(absolute_url)
+    def _parse_page(self, html: str):
+        """Parse raw HTML with Lexbor, or lxml when Lexbor is disabled."""
+        if self.use_lexbor:
+            return LexborHTMLParser(html)
+        return lxml.html.fromstring(html)
+    
+    def _extract_urls_from_html(self, html: str, base_url: str) -> List[str]:
+        """Parse raw HTML and extract its URLs."""
+        try:
+            tree = self._parse_page(html)
+        except (lxml.etree.ParserError, ValueError) as e:
+            logger.debug(f"Error parsing HTML for link extraction: {e}")
+            return []
+        
+        return self._extract_urls_from_soup(tree, base_url)
+    
+    def _extract_urls_from_soup(self, tree, base_url: str) -> List[str]:
+        """Extract URLs from a page parsed by Lexbor or lxml."""
+        if isinstance(tree, LexborHTMLParser):
+            hrefs = (node.attributes.get('href') for node in tree.css('a[href]'))
+        else:
+            hrefs = (link for element, attribute, link, _ in tree.iterlinks()
+                     if element.tag == 'a' and attribute == 'href')
+        
+        links = [urljoin(base_url, href) for href in hrefs if href is not None]
         return self._filter_and_normalize_urls(links, base_url)
     
     def _filter_and_normalize_urls(self, urls: List[str], base_url: str) -> List[str]:
         """Filter and normalize URLs to same domain."""
         base_domain = urlparse(base_url).netloc
+        seen: Set[str] = set()
         filtered_urls = []
         
-        for url in urls:
+        # Drop exact duplicates up front (nav/footer links repeat on every
+        # page) so each distinct string is parsed and filtered only once
+        for url in dict.fromkeys(urls):
             try:
                 parsed = urlparse(url)
                 
-                # Only same domain
-                if parsed.netloc != base_domain:
-                    continue
-                
-                # Skip non-http schemes
-                if parsed.scheme not in ['http', 'https']:
+                # Only same-domain http(s) URLs that look like web pages
+                if (parsed.netloc != base_domain or
+                    parsed.scheme not in _ALLOWED_SCHEMES or
+                    _SKIP_EXT_RE.search(parsed.path) is not None):
                     continue
                 
-                # Skip files that are unlikely to be web pages
-                if parsed.path.lower().endswith(('.pdf', '.jpg', '.jpeg', '.png', '.gif', 
-                                               '.css', '.js', '.xml', '.zip', '.doc', '.docx')):
-                    continue
-                
-                # Normalize URL (remove fragment, sort query params)
+                # Normalize URL (remove fragment), keeping first-seen order
                 normalized = self.normalize_url(url)
-                if normalized:
+                if normalized and normalized not in seen:
+                    seen.add(normalized)
                     filtered_urls.append(normalized)
                     
             except Exception as e:
                 logger.debug(f"Error processing URL {url}: {e}")
                 continue
         
-        return list(set(filtered_urls))  # Remove duplicates
+        return filtered_urls
     
-    def normalize_url(self, url: str) -> Optional[str]:
+    @staticmethod
+    def normalize_url(url: str) -> Optional[str]:
         """Normalize URL by removing fragments and unnecessary parameters."""
-        try:
-            parsed = urlparse(url.strip())
-            
-            # Basic validation
-            if not parsed.netloc or parsed.scheme not in ['http', 'https']:
-                return None
-            
-            # Remove fragment
-            normalized = urlunparse((
-                parsed.scheme,
-                parsed.netloc.lower(),
-                parsed.path,
-                parsed.params,
-                parsed.query,
-                ''  # Remove fragment
-            ))
-            
-            return normalized
-            
-        except Exception:
-            return None
+        return _normalize_url(url)
     
     def _can_fetch_url(self, url: str) -> bool:
         """Check if URL can be fetched according to robots.txt."""
@@ -394,9 +477,55 @@ class CrawlerService:
                 return True
                 
             # Check if our user agent can fetch this URL
-            user_agent = 'Mozilla/5.0 (compatible; AEOBooster/1.0; +https://aeobooster.com)'
-            return rp.can_fetch(user_agent, url)
+            return rp.can_fetch(USER_AGENT, url)
             
         except Exception as e:
             logger.debug(f"Error checking robots.txt for {url}: {e}")
-            return True  # Default to allowing if check fails
\ No newline at end of file
+            return True  # Default to allowing if check fails
+    
+    async def _can_fetch_url_async(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """
+        Check robots.txt using the crawl's aiohttp session.
+        
+        robots.txt is fetched at most once per host; concurrent lookups for
+        the same host wait on a per-host lock instead of fetching it again.
+        """
+        try:
+            parsed = urlparse(url)
+            robot_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+            
+            if robot_url not in self.robots_cache:
+                lock = self._robots_locks.setdefault(robot_url, asyncio.Lock())
+                async with lock:
+                    if robot_url not in self.robots_cache:
+                        self.robots_cache[robot_url] = await self._fetch_robots(session, robot_url)
+            
+            rp = self.robots_cache[robot_url]
+            if rp is None:
+                return True
+            
+            return rp.can_fetch(USER_AGENT, url)
+            
+        except Exception as e:
+            logger.debug(f"Error checking robots.txt for {url}: {e}")
+            return True  # Default to allowing if check fails
+    
+    async def _fetch_robots(self, session: aiohttp.ClientSession, robot_url: str) -> Optional[RobotFileParser]:
+        """Fetch and parse robots.txt, mirroring RobotFileParser.read() status handling."""
+        rp = RobotFileParser(robot_url)
+        try:
+            response = await session.get(robot_url)
+            try:
+                if response.status in (401, 403):
+                    rp.disallow_all = True
+                elif 400 <= response.status < 500:
+                    rp.allow_all = True
+                elif response.status < 400:
+                    rp.parse((await response.text()).splitlines())
+                # Server errors leave rp unparsed, so can_fetch() denies like read() does
+            finally:
+                response.release()
+        except Exception:
+            # If robots.txt can't be read, allow crawling
+            return None
+        return rp
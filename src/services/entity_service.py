@@ -1,7 +1,7 @@
 """
 Entity service for database operations and entity management.
 """
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func, desc
 from datetime import datetime
@@ -15,12 +15,23 @@ from .entity_extractor import EntityExtractor
 
 logger = logging.getLogger(__name__)
 
+# Shared extractor so the spaCy pipeline is loaded once per process rather
+# than once per EntityService (the API builds a new service per request)
+_extractor: Optional[EntityExtractor] = None
+
+def get_shared_extractor() -> EntityExtractor:
+    """Return the process-wide EntityExtractor, creating it on first use."""
+    global _extractor
+    if _extractor is None:
+        _extractor = EntityExtractor()
+    return _extractor
+
 class EntityService:
     """Service for managing entity extraction and database operations."""
     
     def __init__(self):
         """Initialize the entity service."""
-        self.extractor = EntityExtractor()
+        self.extractor = get_shared_extractor()
         
     async def extract_and_store_entities(
         self, 
@@ -81,6 +92,7 @@ class EntityService:
             total_entities = 0
             successful_pages = 0
             failed_pages = 0
+            entity_cache: Dict[Tuple[str, str], Entity] = {}
             
             for result in extraction_results:
                 if result.get("error"):
@@ -89,7 +101,7 @@ class EntityService:
                     continue
                     
                 try:
-                    entities_stored = self._store_entities(db, result)
+                    entities_stored = self._store_entities(db, result, entity_cache)
                     total_entities += entities_stored
                     successful_pages += 1
                 except Exception as e:
@@ -118,17 +130,29 @@ class EntityService:
         finally:
             db.close()
     
-    def _store_entities(self, db: Session, extraction_result: EntityExtractionResult) -> int:
+    def _store_entities(
+        self, 
+        db: Session, 
+        extraction_result: EntityExtractionResult,
+        entity_cache: Optional[Dict[Tuple[str, str], Entity]] = None
+    ) -> int:
         """
         Store extracted entities in the database with deduplication.
         
         Args:
             db: Database session
             extraction_result: Extraction result containing entities
+            entity_cache: Optional map of (entity_type, normalized_value) to
+                entities already seen in this extraction run; shared across
+                pages so repeats are counted without re-querying, including
+                entities that are still pending in the session
             
         Returns:
             Number of entities stored
         """
+        if entity_cache is None:
+            entity_cache = {}
+            
         if not extraction_result.get("entities"):
             return 0
             
@@ -140,13 +164,18 @@ class EntityService:
         for entity_data in extraction_result["entities"]:
             try:
                 # Check if entity already exists (deduplication)
-                existing_entity = db.query(Entity).filter(
-                    and_(
-                        Entity.project_id == project_id,
-                        Entity.normalized_value == entity_data["normalized_value"],
-                        Entity.entity_type == entity_data["entity_type"]
-                    )
-                ).first()
+                cache_key = (entity_data["entity_type"], entity_data["normalized_value"])
+                existing_entity = entity_cache.get(cache_key)
+                if existing_entity is None:
+                    existing_entity = db.query(Entity).filter(
+                        and_(
+                            Entity.project_id == project_id,
+                            Entity.normalized_value == entity_data["normalized_value"],
+                            Entity.entity_type == entity_data["entity_type"]
+                        )
+                    ).first()
+                    if existing_entity:
+                        entity_cache[cache_key] = existing_entity
                 
                 if existing_entity:
                     # Update existing entity with higher confidence or frequency
@@ -172,6 +201,7 @@ class EntityService:
                     )
                     
                     db.add(entity)
+                    entity_cache[cache_key] = entity
                     entities_stored += 1
                     
             except Exception as e:
@@ -2,9 +2,154 @@
 NLP processing utilities for content preprocessing and text cleaning.
 """
 import re
+from functools import lru_cache
 from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 import html
+import orjson
+
+# Common stop words and noise patterns
+_NOISE_PATTERNS = [
+    r'Copyright\s+\©?\s*\d{4}.*',
+    r'All rights reserved\.?',
+    r'Terms of Service',
+    r'Privacy Policy',
+    r'Cookie Policy',
+    r'Sign up|Sign in|Login|Register',
+    r'Follow us on|Connect with us',
+    r'Subscribe to|Join our newsletter',
+]
+
+# Navigation and UI text patterns
+_NAVIGATION_PATTERNS = [
+    r'^Home$|^About$|^Contact$|^Services$|^Products$',
+    r'^Menu$|^Navigation$',
+    r'^Search$|^Filter$|^Sort by$',
+    r'^Next$|^Previous$|^Back$',
+    r'^Share$|^Print$|^Download$',
+]
+
+# All noise patterns as one alternation so clean_text scans once
+_NOISE_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in _NOISE_PATTERNS),
+    re.IGNORECASE
+)
+
+# Navigation patterns only match whole strings, so a set lookup replaces the regex scan
+_NAVIGATION_TERMS = frozenset(
+    term.strip('^$').lower()
+    for pattern in _NAVIGATION_PATTERNS
+    for term in pattern.split('|')
+)
+_WS_RE = re.compile(r'\s+')
+
+# A '<' that does not open a tag or comment; escaped so Lexbor keeps it as text
+_STRAY_LT_RE = re.compile(r'<(?!!--|[A-Za-z/!?][^<>]*>)')
+
+# Common entities decoded without html.unescape; &amp; goes last so it can't form new ones
+_COMMON_ENTITIES = (
+    ('&lt;', '<'), ('&gt;', '>'), ('&quot;', '"'), ('&#39;', "'"),
+    ('&nbsp;', '\xa0'), ('&amp;', '&'),
+)
+_OTHER_ENTITY_RE = re.compile(r'&(?!(?:lt|gt|quot|#39|nbsp|amp);)')
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+# Common business stop words to filter out
+_BUSINESS_STOP_WORDS = frozenset({
+    'company', 'business', 'service', 'product', 'solution',
+    'website', 'page', 'site', 'information', 'content',
+    'click', 'here', 'more', 'read', 'view', 'see',
+    'learn', 'discover', 'find', 'get', 'contact',
+    'home', 'about', 'services', 'products', 'portfolio'
+})
+
+# Structured data fields (lowercased) that contain business entities
+_BUSINESS_FIELDS = frozenset(field.lower() for field in [
+    'name', 'alternateName', 'description', 'headline',
+    'brand', 'manufacturer', 'category', 'serviceType',
+    'jobTitle', 'organizationName', 'productName',
+    'offers', 'priceRange', 'location', 'address'
+])
+
+_CAPITALIZED_WORD_RE = re.compile(r'\b[A-Z][a-z]+\b')
+_PRICE_LIKE_RE = re.compile(r'\$\d+|\d+%|\d+\.\d+')
+
+_FIELD_BASE_SCORES = {
+    'title': 0.9,
+    'headings': 0.8,
+    'meta_description': 0.7,
+    'structured_data': 0.8,
+    'content_main': 0.6,
+    'content_secondary': 0.4,
+    'content_text': 0.5
+}
+
+def _walk_structured_data(structured_data) -> str:
+    """Join the business-relevant text found in parsed structured data."""
+    text_parts = []
+    
+    def extract_text_recursive(data):
+        """Recursively extract text from structured data."""
+        if isinstance(data, dict):
+            for key, value in data.items():
+                if key.lower() in _BUSINESS_FIELDS:
+                    if isinstance(value, str):
+                        text_parts.append(value)
+                    elif isinstance(value, (list, dict)):
+                        extract_text_recursive(value)
+                else:
+                    extract_text_recursive(value)
+        elif isinstance(data, list):
+            for item in data:
+                extract_text_recursive(item)
+        elif isinstance(data, str) and len(data.strip()) > 0:
+            text_parts.append(data)
+            
+    extract_text_recursive(structured_data)
+    
+    return " | ".join(text_parts)
+
+@lru_cache(maxsize=1024)
+def _structured_data_text(raw) -> str:
+    """Parse and walk a serialized structured data block, cached by its content."""
+    try:
+        structured_data = orjson.loads(raw)
+    except orjson.JSONDecodeError:
+        structured_data = raw
+    return _walk_structured_data(structured_data)
+
+def _unescape(text: str) -> str:
+    """Decode HTML entities, skipping html.unescape when only common ones appear."""
+    if '&' not in text:
+        return text
+    if _OTHER_ENTITY_RE.search(text):
+        return html.unescape(text)
+        
+    for entity, char in _COMMON_ENTITIES:
+        if entity in text:
+            text = text.replace(entity, char)
+    return text
+
+@lru_cache(maxsize=4096)
+def _content_importance_score(content: str, source_field: str) -> float:
+    """Cached scoring behind NLPProcessor.calculate_content_importance_score."""
+    base_score = _FIELD_BASE_SCORES.get(source_field, 0.3)
+    
+    # Adjust based on content characteristics
+    if content:
+        # Shorter content in high-priority fields is often more focused
+        if source_field in ['title', 'headings'] and len(content) < 100:
+            base_score += 0.1
+            
+        # Content with proper capitalization suggests more structured information
+        if _CAPITALIZED_WORD_RE.search(content):
+            base_score += 0.05
+            
+        # Content with numbers/prices suggests product/service information
+        if _PRICE_LIKE_RE.search(content):
+            base_score += 0.1
+            
+    return min(base_score, 1.0)
 
 class NLPProcessor:
     """Utilities for NLP text preprocessing and cleaning."""
@@ -12,34 +157,13 @@ class NLPProcessor:
     def __init__(self):
         """Initialize the NLP processor."""
         # Common stop words and noise patterns
-        self.noise_patterns = [
-            r'Copyright\s+\©?\s*\d{4}.*',
-            r'All rights reserved\.?',
-            r'Terms of Service',
-            r'Privacy Policy',
-            r'Cookie Policy',
-            r'Sign up|Sign in|Login|Register',
-            r'Follow us on|Connect with us',
-            r'Subscribe to|Join our newsletter',
-        ]
+        self.noise_patterns = _NOISE_PATTERNS
         
         # Navigation and UI text patterns
-        self.navigation_patterns = [
-            r'^Home$|^About$|^Contact$|^Services$|^Products$',
-            r'^Menu$|^Navigation$',
-            r'^Search$|^Filter$|^Sort by$',
-            r'^Next$|^Previous$|^Back$',
-            r'^Share$|^Print$|^Download$',
-        ]
+        self.navigation_patterns = _NAVIGATION_PATTERNS
         
         # Common business stop words to filter out
-        self.business_stop_words = {
-            'company', 'business', 'service', 'product', 'solution',
-            'website', 'page', 'site', 'information', 'content',
-            'click', 'here', 'more', 'read', 'view', 'see',
-            'learn', 'discover', 'find', 'get', 'contact',
-            'home', 'about', 'services', 'products', 'portfolio'
-        }
+        self.business_stop_words = _BUSINESS_STOP_WORDS
     
     def clean_text(self, text: str) -> str:
         """
@@ -54,26 +178,29 @@ class NLPProcessor:
         if not text:
             return ""
             
-        # Decode HTML entities
-        text = html.unescape(text)
-        
-        # Remove HTML tags if any
-        text = BeautifulSoup(text, 'html.parser').get_text()
+        # Remove HTML tags if any; Lexbor decodes HTML entities in the text it returns
+        if '<' in text:
+            tree = LexborHTMLParser(_STRAY_LT_RE.sub('&lt;', text))
+            tree.strip_tags(['script', 'style'])
+            text = tree.text()
+        else:
+            # Decode HTML entities
+            text = _unescape(text)
         
         # Remove extra whitespace and normalize
-        text = re.sub(r'\s+', ' ', text)
+        text = _WS_RE.sub(' ', text)
         
-        # Remove noise patterns
-        for pattern in self.noise_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-            
-        # Remove navigation patterns
-        for pattern in self.navigation_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+        # Remove noise patterns in a single pass
+        text = _NOISE_RE.sub('', text)
         
-        # Clean up remaining whitespace
+        # Clean up remaining whitespace before the whole-string navigation check,
+        # since tag stripping may or may not have left leading whitespace
         text = text.strip()
         
+        # Remove navigation-only text
+        if text.lower() in _NAVIGATION_TERMS:
+            text = ''
+        
         return text
     
     def segment_content(self, page_content: Dict[str, Any]) -> Dict[str, str]:
@@ -122,17 +249,17 @@ class NLPProcessor:
         if not headings:
             return ""
             
-        heading_texts = []
-        for heading in headings:
-            if isinstance(heading, dict):
-                if 'text' in heading:
-                    heading_texts.append(heading['text'])
-                elif 'content' in heading:
-                    heading_texts.append(heading['content'])
-            elif isinstance(heading, str):
-                heading_texts.append(heading)
+        def heading_texts():
+            for heading in headings:
+                if isinstance(heading, str):
+                    yield heading
+                elif isinstance(heading, dict):
+                    if 'text' in heading:
+                        yield heading['text']
+                    elif 'content' in heading:
+                        yield heading['content']
                 
-        return " | ".join(heading_texts)  # Use separator to maintain context
+        return " | ".join(heading_texts())  # Use separator to maintain context
     
     def _split_content(self, content: str, max_main_length: int = 2000) -> Dict[str, str]:
         """
@@ -154,14 +281,18 @@ class NLPProcessor:
         # Find a good breaking point (paragraph, sentence)
         break_point = max_main_length
         
+        # Only search the tail window where a break is acceptable
+        para_start = int(max_main_length * 0.7) + 1  # At least 70% of target length
+        sent_start = int(max_main_length * 0.8) + 1  # At least 80% of target length
+        
         # Try to break at paragraph boundary
-        para_break = content.rfind('\n\n', 0, max_main_length)
-        if para_break > max_main_length * 0.7:  # At least 70% of target length
+        para_break = content.rfind('\n\n', para_start, max_main_length)
+        if para_break != -1:
             break_point = para_break
         else:
             # Try to break at sentence boundary
-            sent_break = content.rfind('. ', 0, max_main_length)
-            if sent_break > max_main_length * 0.8:  # At least 80% of target length
+            sent_break = content.rfind('. ', sent_start, max_main_length)
+            if sent_break != -1:
                 break_point = sent_break + 1
                 
         return {
@@ -169,41 +300,21 @@ class NLPProcessor:
             'secondary': content[break_point:]
         }
     
-    def _extract_structured_data_text(self, structured_data: Dict) -> str:
+    def _extract_structured_data_text(self, structured_data) -> str:
         """Extract relevant text from structured data (JSON-LD, microdata, etc.)."""
         if not structured_data:
             return ""
             
-        text_parts = []
-        
-        # Common structured data fields that contain business entities
-        business_fields = [
-            'name', 'alternateName', 'description', 'headline',
-            'brand', 'manufacturer', 'category', 'serviceType',
-            'jobTitle', 'organizationName', 'productName',
-            'offers', 'priceRange', 'location', 'address'
-        ]
-        
-        def extract_text_recursive(data, path=""):
-            """Recursively extract text from structured data."""
-            if isinstance(data, dict):
-                for key, value in data.items():
-                    if key.lower() in [f.lower() for f in business_fields]:
-                        if isinstance(value, str):
-                            text_parts.append(value)
-                        elif isinstance(value, (list, dict)):
-                            extract_text_recursive(value, f"{path}.{key}")
-                    else:
-                        extract_text_recursive(value, f"{path}.{key}")
-            elif isinstance(data, list):
-                for item in data:
-                    extract_text_recursive(item, path)
-            elif isinstance(data, str) and len(data.strip()) > 0:
-                text_parts.append(data)
-                
-        extract_text_recursive(structured_data)
-        
-        return " | ".join(text_parts)
+        # JSON-LD may arrive as a raw JSON string
+        if isinstance(structured_data, (str, bytes)):
+            return _structured_data_text(structured_data)
+            
+        # Key the cache on the serialized block so repeated schema is walked once
+        try:
+            raw = orjson.dumps(structured_data)
+        except TypeError:
+            return _walk_structured_data(structured_data)
+        return _structured_data_text(raw)
     
     def filter_noise_entities(self, entities: List[str]) -> List[str]:
         """
@@ -225,15 +336,15 @@ class NLPProcessor:
                 continue
                 
             # Skip if it's a common stop word
-            if entity_lower in self.business_stop_words:
+            if entity_lower in _BUSINESS_STOP_WORDS:
                 continue
                 
             # Skip if it matches navigation patterns
-            if any(re.match(pattern, entity, re.IGNORECASE) for pattern in self.navigation_patterns):
+            if entity_lower in _NAVIGATION_TERMS:
                 continue
                 
             # Skip if it's mostly numbers or punctuation
-            if len(re.sub(r'[^\w\s]', '', entity_lower)) < 2:
+            if len(_PUNCT_RE.sub('', entity_lower)) < 2:
                 continue
                 
             filtered.append(entity)
@@ -251,30 +362,4 @@ class NLPProcessor:
         Returns:
             Importance score between 0.0 and 1.0
         """
-        base_scores = {
-            'title': 0.9,
-            'headings': 0.8,
-            'meta_description': 0.7,
-            'structured_data': 0.8,
-            'content_main': 0.6,
-            'content_secondary': 0.4,
-            'content_text': 0.5
-        }
-        
-        base_score = base_scores.get(source_field, 0.3)
-        
-        # Adjust based on content characteristics
-        if content:
-            # Shorter content in high-priority fields is often more focused
-            if source_field in ['title', 'headings'] and len(content) < 100:
-                base_score += 0.1
-                
-            # Content with proper capitalization suggests more structured information
-            if re.search(r'\b[A-Z][a-z]+\b', content):
-                base_score += 0.05
-                
-            # Content with numbers/prices suggests product/service information
-            if re.search(r'\$\d+|\d+%|\d+\.\d+', content):
-                base_score += 0.1
-                
-        return min(base_score, 1.0)
\ No newline at end of file
+        return _content_importance_score(content, source_field)
@@ -1,218 +1,343 @@
 """
 Page classification service for identifying page types and content categories.
 """
+import hashlib
 import logging
 import re
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, List, Tuple, Optional
 from urllib.parse import urlparse
 
+import ahocorasick
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# URL pattern rules for page type detection
+URL_PATTERNS = {
+    'product': [
+        r'/product[s]?/',
+        r'/item[s]?/',
+        r'/shop/',
+        r'/store/',
+        r'/buy/',
+        r'/catalog/',
+        r'/p/',
+        r'-p\d+',  # product IDs
+        r'/sku/',
+        r'/products/.+',
+        r'/items/.+',
+    ],
+    'service': [
+        r'/service[s]?/',
+        r'/solutions?/',
+        r'/offerings?/',
+        r'/what-we-do/',
+        r'/our-services/',
+        r'/consultation/',
+        r'/consulting/',
+    ],
+    'blog': [
+        r'/blog/',
+        r'/news/',
+        r'/article[s]?/',
+        r'/post[s]?/',
+        r'/insights?/',
+        r'/updates?/',
+        r'/press/',
+        r'/stories/',
+        r'/resources/blog/',
+        r'/\d{4}/\d{2}/',  # Date patterns like /2024/01/
+    ],
+    'about': [
+        r'/about/',
+        r'/company/',
+        r'/who-we-are/',
+        r'/our-story/',
+        r'/history/',
+        r'/team/',
+        r'/leadership/',
+        r'/mission/',
+        r'/vision/',
+    ],
+    'contact': [
+        r'/contact/',
+        r'/get-in-touch/',
+        r'/reach-us/',
+        r'/support/',
+        r'/help/',
+        r'/customer-service/',
+    ],
+    'pricing': [
+        r'/pricing/',
+        r'/plans?/',
+        r'/packages?/',
+        r'/costs?/',
+        r'/rates?/',
+        r'/subscription/',
+    ],
+    'faq': [
+        r'/faq/',
+        r'/frequently-asked-questions/',
+        r'/questions/',
+        r'/q-and-a/',
+        r'/help-center/',
+    ],
+    'homepage': [
+        r'^/$',
+        r'^/index',
+        r'^/home',
+        r'^/welcome',
+    ],
+    'category': [
+        r'/categor(y|ies)/',
+        r'/departments?/',
+        r'/sections?/',
+        r'/types?/',
+        r'/browse/',
+    ],
+    'legal': [
+        r'/privacy/',
+        r'/terms/',
+        r'/legal/',
+        r'/policy/',
+        r'/disclaimer/',
+        r'/copyright/',
+        r'/license/',
+    ]
+}
+
+# Content-based keywords for classification
+CONTENT_KEYWORDS = {
+    'product': {
+        'strong': [
+            'add to cart', 'buy now', 'purchase', 'price', 'in stock',
+            'out of stock', 'sku', 'product details', 'specifications',
+            'reviews', 'rating', 'customer reviews', '$', 'USD', 'EUR',
+            'shipping', 'delivery', 'warranty', 'return policy'
+        ],
+        'medium': [
+            'features', 'benefits', 'description', 'overview',
+            'availability', 'quantity', 'size', 'color', 'model',
+            'brand', 'manufacturer', 'technical specs'
+        ]
+    },
+    'service': {
+        'strong': [
+            'our services', 'what we do', 'solutions', 'consulting',
+            'professional services', 'expertise', 'consultation',
+            'get started', 'free consultation', 'contact us today'
+        ],
+        'medium': [
+            'experience', 'years of experience', 'qualified',
+            'certified', 'portfolio', 'case studies', 'results',
+            'approach', 'methodology', 'process'
+        ]
+    },
+    'blog': {
+        'strong': [
+            'published on', 'posted on', 'by author', 'read more',
+            'comments', 'share this', 'tags:', 'categories:',
+            'related posts', 'recent posts', 'archive'
+        ],
+        'medium': [
+            'learn more', 'tips', 'guide', 'tutorial', 'how to',
+            'best practices', 'insights', 'analysis', 'opinion',
+            'industry news', 'trends'
+        ]
+    },
+    'about': {
+        'strong': [
+            'about us', 'our story', 'our mission', 'our vision',
+            'who we are', 'company history', 'founded in',
+            'our team', 'leadership team', 'meet the team'
+        ],
+        'medium': [
+            'values', 'culture', 'philosophy', 'background',
+            'experience', 'commitment', 'dedication', 'passion',
+            'journey', 'growth'
+        ]
+    },
+    'contact': {
+        'strong': [
+            'contact us', 'get in touch', 'reach us', 'phone:',
+            'email:', 'address:', 'office hours', 'contact form',
+            'send message', 'call us', 'visit us'
+        ],
+        'medium': [
+            'location', 'directions', 'map', 'office', 'headquarters',
+            'support', 'customer service', 'help desk'
+        ]
+    },
+    'pricing': {
+        'strong': [
+            'pricing', 'plans', 'packages', 'subscription', 'cost',
+            'per month', 'per year', 'annual', 'monthly',
+            'free trial', 'sign up', 'choose plan'
+        ],
+        'medium': [
+            'features included', 'compare plans', 'upgrade',
+            'downgrade', 'billing', 'payment', 'discount'
+        ]
+    },
+    'faq': {
+        'strong': [
+            'frequently asked questions', 'faq', 'questions and answers',
+            'q&a', 'common questions', 'help center'
+        ],
+        'medium': [
+            'question:', 'answer:', 'how do i', 'what is',
+            'why does', 'when will', 'can i', 'troubleshooting'
+        ]
+    },
+    'homepage': {
+        'strong': [
+            'welcome to', 'home page', 'main page', 'get started',
+            'learn more about', 'discover', 'explore our',
+            'featured products', 'latest news'
+        ],
+        'medium': [
+            'overview', 'introduction', 'what we offer',
+            'our company', 'solutions', 'services'
+        ]
+    }
+}
+
+# Structured data type indicators
+STRUCTURED_DATA_TYPES = {
+    'product': ['Product', 'Offer', 'Review', 'AggregateRating'],
+    'service': ['Service', 'Organization', 'LocalBusiness'],
+    'blog': ['Article', 'BlogPosting', 'NewsArticle'],
+    'about': ['Organization', 'Corporation', 'Person'],
+    'contact': ['Organization', 'LocalBusiness', 'ContactPoint'],
+    'faq': ['FAQPage', 'Question', 'Answer']
+}
+
+# Schema.org types mapped to the page types they indicate
+SCHEMA_TYPE_TO_CATEGORY = {}
+for _page_type, _schema_types in STRUCTURED_DATA_TYPES.items():
+    for _schema_type in _schema_types:
+        SCHEMA_TYPE_TO_CATEGORY.setdefault(_schema_type, []).append(_page_type)
+
+# Number of page classifications remembered per classifier
+_CLASSIFICATION_CACHE_SIZE = 4096
+
+def _fingerprint(value) -> bytes:
+    """Short content digest used to key cached classifications."""
+    if not isinstance(value, bytes):
+        value = str(value).encode()
+    return hashlib.blake2b(value, digest_size=8).digest()
+
+# Single-segment URL patterns like '/blog/', '/product[s]?/', '/solutions?/', '/categor(y|ies)/'
+_SEGMENT_PATTERN_RE = re.compile(r'^/([a-z-]+?)(?:(\[s\]\?)|([a-z])\?|\(([a-z|]+)\))?/$')
+
+def _expand_segment_pattern(pattern: str) -> Optional[List[str]]:
+    """Expand a single-segment URL pattern into the literal segments it matches."""
+    match = _SEGMENT_PATTERN_RE.match(pattern)
+    if not match:
+        return None
+        
+    stem, plural, optional_char, alternatives = match.groups()
+    if plural:
+        return [stem, stem + 's']
+    if optional_char:
+        return [stem, stem + optional_char]
+    if alternatives:
+        return [stem + alternative for alternative in alternatives.split('|')]
+    return [stem]
+
+def _build_url_index() -> Tuple[Dict[str, frozenset], Dict[str, re.Pattern]]:
+    """Index literal path segments by page type; other patterns stay as regexes."""
+    segment_types = {}
+    fallback_patterns = {}
+    
+    for page_type, patterns in URL_PATTERNS.items():
+        other_patterns = []
+        for pattern in patterns:
+            segments = _expand_segment_pattern(pattern)
+            if segments is None:
+                other_patterns.append(pattern)
+                continue
+            for segment in segments:
+                segment_types.setdefault(segment, set()).add(page_type)
+                
+        if other_patterns:
+            fallback_patterns[page_type] = re.compile(
+                "|".join(f"(?:{pattern})" for pattern in other_patterns)
+            )
+    
+    return (
+        {segment: frozenset(types) for segment, types in segment_types.items()},
+        fallback_patterns
+    )
+
+_URL_SEGMENT_TYPES, _URL_FALLBACK_PATTERNS = _build_url_index()
+
+@lru_cache(maxsize=4096)
+def _url_page_types(path: str) -> frozenset:
+    """Get the page types whose URL patterns match a lowercased URL path."""
+    page_types = set()
+    
+    # Only segments with a slash on both sides can match a '/name/' pattern
+    for segment in path.split('/')[1:-1]:
+        page_types.update(_URL_SEGMENT_TYPES.get(segment, ()))
+        
+    for page_type, pattern in _URL_FALLBACK_PATTERNS.items():
+        if page_type not in page_types and pattern.search(path):
+            page_types.add(page_type)
+            
+    return frozenset(page_types)
+
+# Content keywords lowercased once per page type and strength
+_LOWERED_KEYWORDS = {
+    page_type: {
+        strength: tuple(keyword.lower() for keyword in keyword_list)
+        for strength, keyword_list in keywords.items()
+    }
+    for page_type, keywords in CONTENT_KEYWORDS.items()
+}
+
+_ALL_KEYWORDS = frozenset(
+    keyword
+    for keywords in _LOWERED_KEYWORDS.values()
+    for keyword_list in keywords.values()
+    for keyword in keyword_list
+)
+
+# Which page types and strengths each keyword counts towards
+_KEYWORD_INCIDENCE = {}
+for _page_type, _keywords in _LOWERED_KEYWORDS.items():
+    for _strength, _keyword_list in _keywords.items():
+        for _keyword in _keyword_list:
+            _KEYWORD_INCIDENCE.setdefault(_keyword, []).append((_page_type, _strength))
+
+# Single automaton over every keyword so content is scanned once for all page types
+_KEYWORD_AUTOMATON = ahocorasick.Automaton()
+for _keyword in _ALL_KEYWORDS:
+    _KEYWORD_AUTOMATON.add_word(_keyword, _keyword)
+_KEYWORD_AUTOMATON.make_automaton()
+
+def _find_keywords(content_lower: str) -> set:
+    """Return every classifier keyword that occurs in lowercased content."""
+    return {keyword for _, keyword in _KEYWORD_AUTOMATON.iter(content_lower)}
+
 class PageClassifier:
     """Classify web pages by type and content category."""
     
     def __init__(self):
         """Initialize page classifier with rules and keywords."""
-        
         # URL pattern rules for page type detection
-        self.url_patterns = {
-            'product': [
-                r'/product[s]?/',
-                r'/item[s]?/',
-                r'/shop/',
-                r'/store/',
-                r'/buy/',
-                r'/catalog/',
-                r'/p/',
-                r'-p\d+',  # product IDs
-                r'/sku/',
-                r'/products/.+',
-                r'/items/.+',
-            ],
-            'service': [
-                r'/service[s]?/',
-                r'/solutions?/',
-                r'/offerings?/',
-                r'/what-we-do/',
-                r'/our-services/',
-                r'/consultation/',
-                r'/consulting/',
-            ],
-            'blog': [
-                r'/blog/',
-                r'/news/',
-                r'/article[s]?/',
-                r'/post[s]?/',
-                r'/insights?/',
-                r'/updates?/',
-                r'/press/',
-                r'/stories/',
-                r'/resources/blog/',
-                r'/\d{4}/\d{2}/',  # Date patterns like /2024/01/
-            ],
-            'about': [
-                r'/about/',
-                r'/company/',
-                r'/who-we-are/',
-                r'/our-story/',
-                r'/history/',
-                r'/team/',
-                r'/leadership/',
-                r'/mission/',
-                r'/vision/',
-            ],
-            'contact': [
-                r'/contact/',
-                r'/get-in-touch/',
-                r'/reach-us/',
-                r'/support/',
-                r'/help/',
-                r'/customer-service/',
-            ],
-            'pricing': [
-                r'/pricing/',
-                r'/plans?/',
-                r'/packages?/',
-                r'/costs?/',
-                r'/rates?/',
-                r'/subscription/',
-            ],
-            'faq': [
-                r'/faq/',
-                r'/frequently-asked-questions/',
-                r'/questions/',
-                r'/q-and-a/',
-                r'/help-center/',
-            ],
-            'homepage': [
-                r'^/$',
-                r'^/index',
-                r'^/home',
-                r'^/welcome',
-            ],
-            'category': [
-                r'/categor(y|ies)/',
-                r'/departments?/',
-                r'/sections?/',
-                r'/types?/',
-                r'/browse/',
-            ],
-            'legal': [
-                r'/privacy/',
-                r'/terms/',
-                r'/legal/',
-                r'/policy/',
-                r'/disclaimer/',
-                r'/copyright/',
-                r'/license/',
-            ]
-        }
+        self.url_patterns = URL_PATTERNS
         
         # Content-based keywords for classification
-        self.content_keywords = {
-            'product': {
-                'strong': [
-                    'add to cart', 'buy now', 'purchase', 'price', 'in stock',
-                    'out of stock', 'sku', 'product details', 'specifications',
-                    'reviews', 'rating', 'customer reviews', '$', 'USD', 'EUR',
-                    'shipping', 'delivery', 'warranty', 'return policy'
-                ],
-                'medium': [
-                    'features', 'benefits', 'description', 'overview',
-                    'availability', 'quantity', 'size', 'color', 'model',
-                    'brand', 'manufacturer', 'technical specs'
-                ]
-            },
-            'service': {
-                'strong': [
-                    'our services', 'what we do', 'solutions', 'consulting',
-                    'professional services', 'expertise', 'consultation',
-                    'get started', 'free consultation', 'contact us today'
-                ],
-                'medium': [
-                    'experience', 'years of experience', 'qualified',
-                    'certified', 'portfolio', 'case studies', 'results',
-                    'approach', 'methodology', 'process'
-                ]
-            },
-            'blog': {
-                'strong': [
-                    'published on', 'posted on', 'by author', 'read more',
-                    'comments', 'share this', 'tags:', 'categories:',
-                    'related posts', 'recent posts', 'archive'
-                ],
-                'medium': [
-                    'learn more', 'tips', 'guide', 'tutorial', 'how to',
-                    'best practices', 'insights', 'analysis', 'opinion',
-                    'industry news', 'trends'
-                ]
-            },
-            'about': {
-                'strong': [
-                    'about us', 'our story', 'our mission', 'our vision',
-                    'who we are', 'company history', 'founded in',
-                    'our team', 'leadership team', 'meet the team'
-                ],
-                'medium': [
-                    'values', 'culture', 'philosophy', 'background',
-                    'experience', 'commitment', 'dedication', 'passion',
-                    'journey', 'growth'
-                ]
-            },
-            'contact': {
-                'strong': [
-                    'contact us', 'get in touch', 'reach us', 'phone:',
-                    'email:', 'address:', 'office hours', 'contact form',
-                    'send message', 'call us', 'visit us'
-                ],
-                'medium': [
-                    'location', 'directions', 'map', 'office', 'headquarters',
-                    'support', 'customer service', 'help desk'
-                ]
-            },
-            'pricing': {
-                'strong': [
-                    'pricing', 'plans', 'packages', 'subscription', 'cost',
-                    'per month', 'per year', 'annual', 'monthly',
-                    'free trial', 'sign up', 'choose plan'
-                ],
-                'medium': [
-                    'features included', 'compare plans', 'upgrade',
-                    'downgrade', 'billing', 'payment', 'discount'
-                ]
-            },
-            'faq': {
-                'strong': [
-                    'frequently asked questions', 'faq', 'questions and answers',
-                    'q&a', 'common questions', 'help center'
-                ],
-                'medium': [
-                    'question:', 'answer:', 'how do i', 'what is',
-                    'why does', 'when will', 'can i', 'troubleshooting'
-                ]
-            },
-            'homepage': {
-                'strong': [
-                    'welcome to', 'home page', 'main page', 'get started',
-                    'learn more about', 'discover', 'explore our',
-                    'featured products', 'latest news'
-                ],
-                'medium': [
-                    'overview', 'introduction', 'what we offer',
-                    'our company', 'solutions', 'services'
-                ]
-            }
-        }
+        self.content_keywords = CONTENT_KEYWORDS
         
         # Structured data type indicators
-        self.structured_data_types = {
-            'product': ['Product', 'Offer', 'Review', 'AggregateRating'],
-            'service': ['Service', 'Organization', 'LocalBusiness'],
-            'blog': ['Article', 'BlogPosting', 'NewsArticle'],
-            'about': ['Organization', 'Corporation', 'Person'],
-            'contact': ['Organization', 'LocalBusiness', 'ContactPoint'],
-            'faq': ['FAQPage', 'Question', 'Answer']
-        }
+        self.structured_data_types = STRUCTURED_DATA_TYPES
+        
+        # Recent classifications keyed by URL and content fingerprints
+        self._classification_cache = OrderedDict()
     
     def classify_page(self, url: str, title: str, content: str, 
                      structured_data: Optional[Dict] = None) -> Tuple[str, float]:
@@ -228,26 +353,42 @@ class PageClassifier:
         Returns:
             Tuple of (page_type, confidence_score)
         """
-        try:
-            # Combine title and content for analysis
-            text_content = f"{title} {content}".lower()
+        cache_key = self._classification_key(url, title, content, structured_data)
+        if cache_key is None:
+            return self._classify_page_uncached(url, title, content, structured_data)
             
-            # Get scores for each page type
-            scores = {}
+        result = self._classification_cache.get(cache_key)
+        if result is not None:
+            self._classification_cache.move_to_end(cache_key)
+            return result
             
-            for page_type in self.url_patterns.keys():
-                url_score = self._score_url_patterns(url, page_type)
-                content_score = self._score_content_keywords(text_content, page_type)
-                structured_score = self._score_structured_data(structured_data, page_type)
-                
-                # Weighted combination of scores
-                total_score = (
-                    url_score * 0.4 +           # URL patterns are quite reliable
-                    content_score * 0.5 +       # Content is most important
-                    structured_score * 0.1      # Structured data is bonus
+        result = self._classify_page_uncached(url, title, content, structured_data)
+        self._classification_cache[cache_key] = result
+        if len(self._classification_cache) > _CLASSIFICATION_CACHE_SIZE:
+            self._classification_cache.popitem(last=False)
+            
+        return result
+    
+    def _classification_key(self, url: str, title: str, content: str,
+                            structured_data: Optional[Dict]) -> Optional[Tuple]:
+        """Build a cache key for a page, or None if it can't be fingerprinted."""
+        structured_key = None
+        if structured_data:
+            try:
+                structured_key = _fingerprint(
+                    orjson.dumps(structured_data, option=orjson.OPT_SORT_KEYS)
                 )
+            except TypeError:
+                return None
                 
-                scores[page_type] = total_score
+        return (url, _fingerprint(title), _fingerprint(content), structured_key)
+    
+    def _classify_page_uncached(self, url: str, title: str, content: str,
+                                structured_data: Optional[Dict] = None) -> Tuple[str, float]:
+        """Score every page type for a page and pick the best match."""
+        try:
+            # Get scores for each page type
+            scores = self._score_all(url, title, content, structured_data)
             
             # Find the best match
             best_type = max(scores.keys(), key=lambda k: scores[k])
@@ -274,73 +415,132 @@ class PageClassifier:
             logger.error(f"Error classifying page {url}: {e}")
             return 'unknown', 0.0
     
-    def _score_url_patterns(self, url: str, page_type: str) -> float:
-        """Score URL patterns for a given page type."""
-        if page_type not in self.url_patterns:
-            return 0.0
+    def _score_all(self, url: str, title: str, content: str,
+                   structured_data: Optional[Dict] = None) -> Dict[str, float]:
+        """
+        Score every page type from a single pass over the URL, content and structured data.
+        
+        Returns:
+            Dict mapping page types to combined scores
+        """
+        # Combine title and content for analysis
+        text_content = f"{title} {content}".lower()
         
+        url_types = self._url_page_types(url)
+        content_scores = self._score_lowered_content_keywords(text_content)
+        structured_scores = self._score_all_structured_data(structured_data)
+        
+        scores = {}
+        for page_type in self.url_patterns.keys():
+            url_score = 1.0 if page_type in url_types else 0.0
+            content_score = content_scores.get(page_type, 0.0)
+            structured_score = structured_scores.get(page_type, 0.0)
+            
+            # Weighted combination of scores
+            scores[page_type] = (
+                url_score * 0.4 +           # URL patterns are quite reliable
+                content_score * 0.5 +       # Content is most important
+                structured_score * 0.1      # Structured data is bonus
+            )
+        
+        return scores
+    
+    def _url_page_types(self, url: str) -> frozenset:
+        """Get the page types whose URL patterns match a URL."""
         try:
             parsed = urlparse(url)
-            path = parsed.path.lower()
-            
-            # Check each pattern for this page type
-            for pattern in self.url_patterns[page_type]:
-                if re.search(pattern, path):
-                    return 1.0  # Strong match
-            
-            return 0.0
+            return _url_page_types(parsed.path.lower())
             
         except Exception as e:
             logger.debug(f"Error scoring URL patterns for {url}: {e}")
+            return frozenset()
+    
+    def _score_url_patterns(self, url: str, page_type: str) -> float:
+        """Score URL patterns for a given page type."""
+        if page_type not in URL_PATTERNS:
             return 0.0
+        
+        if page_type in self._url_page_types(url):
+            return 1.0  # Strong match
+        
+        return 0.0
     
     def _score_content_keywords(self, content: str, page_type: str) -> float:
         """Score content keywords for a given page type."""
-        if page_type not in self.content_keywords:
+        if page_type not in _LOWERED_KEYWORDS:
             return 0.0
         
+        return self._score_all_content_keywords(content).get(page_type, 0.0)
+    
+    def _score_all_content_keywords(self, content: str) -> Dict[str, float]:
+        """Score content keywords for every page type from a single scan."""
+        return self._score_lowered_content_keywords(content.lower())
+    
+    def _score_lowered_content_keywords(self, content_lower: str) -> Dict[str, float]:
+        """Score content keywords for every page type from already lowercased content."""
         try:
-            keywords = self.content_keywords[page_type]
-            content_lower = content.lower()
-            
-            strong_matches = 0
-            medium_matches = 0
-            
-            # Count strong keyword matches
-            for keyword in keywords.get('strong', []):
-                if keyword.lower() in content_lower:
-                    strong_matches += 1
-            
-            # Count medium keyword matches
-            for keyword in keywords.get('medium', []):
-                if keyword.lower() in content_lower:
-                    medium_matches += 1
-            
-            # Calculate weighted score
-            strong_weight = 0.7
-            medium_weight = 0.3
-            
-            max_strong = len(keywords.get('strong', []))
-            max_medium = len(keywords.get('medium', []))
-            
-            strong_score = (strong_matches / max_strong) if max_strong > 0 else 0
-            medium_score = (medium_matches / max_medium) if max_medium > 0 else 0
+            matches = {
+                page_type: dict.fromkeys(keywords, 0)
+                for page_type, keywords in _LOWERED_KEYWORDS.items()
+            }
             
-            total_score = (strong_score * strong_weight + medium_score * medium_weight)
+            # Tally only the keywords that were found
+            for keyword in _find_keywords(content_lower):
+                for page_type, strength in _KEYWORD_INCIDENCE[keyword]:
+                    matches[page_type][strength] += 1
             
-            return min(total_score, 1.0)  # Cap at 1.0
+            return {
+                page_type: self._keyword_score(page_type, counts)
+                for page_type, counts in matches.items()
+            }
             
         except Exception as e:
-            logger.debug(f"Error scoring content keywords for {page_type}: {e}")
-            return 0.0
+            logger.debug(f"Error scoring content keywords: {e}")
+            return {}
+    
+    def _keyword_score(self, page_type: str, counts: Dict[str, int]) -> float:
+        """Weighted share of a page type's strong and medium keywords that were found."""
+        keywords = _LOWERED_KEYWORDS[page_type]
+        max_strong = len(keywords.get('strong', ()))
+        max_medium = len(keywords.get('medium', ()))
+        
+        # Calculate weighted score
+        strong_weight = 0.7
+        medium_weight = 0.3
+        
+        strong_score = (counts.get('strong', 0) / max_strong) if max_strong > 0 else 0
+        medium_score = (counts.get('medium', 0) / max_medium) if max_medium > 0 else 0
+        
+        total_score = (strong_score * strong_weight + medium_score * medium_weight)
+        
+        return min(total_score, 1.0)  # Cap at 1.0
     
     def _score_structured_data(self, structured_data: Optional[Dict], page_type: str) -> float:
         """Score structured data indicators for a given page type."""
         if not structured_data or page_type not in self.structured_data_types:
             return 0.0
         
+        return self._score_all_structured_data(structured_data).get(page_type, 0.0)
+    
+    def _score_all_structured_data(self, structured_data: Optional[Dict]) -> Dict[str, float]:
+        """Score structured data indicators for every page type at once."""
+        matches = {}
+        
+        for schema_type in self._find_structured_data_types(structured_data):
+            for page_type in SCHEMA_TYPE_TO_CATEGORY.get(schema_type, ()):
+                matches[page_type] = matches.get(page_type, 0) + 1
+        
+        return {
+            page_type: count / len(self.structured_data_types[page_type])
+            for page_type, count in matches.items()
+        }
+    
+    def _find_structured_data_types(self, structured_data: Optional[Dict]) -> set:
+        """Collect the schema types declared in JSON-LD and microdata."""
+        if not structured_data:
+            return set()
+        
         try:
-            target_types = self.structured_data_types[page_type]
             found_types = set()
             
             # Check JSON-LD data
@@ -363,17 +563,11 @@ class PageClassifier:
                         type_name = item_type.split('/')[-1]
                         found_types.add(type_name)
             
-            # Calculate match score
-            matches = 0
-            for target_type in target_types:
-                if target_type in found_types:
-                    matches += 1
-            
-            return matches / len(target_types) if target_types else 0.0
+            return found_types
             
         except Exception as e:
-            logger.debug(f"Error scoring structured data for {page_type}: {e}")
-            return 0.0
+            logger.debug(f"Error scoring structured data: {e}")
+            return set()
     
     def get_page_categories(self) -> List[str]:
         """Get list of all available page categories."""
@@ -387,20 +581,6 @@ class PageClassifier:
         Returns:
             Dict mapping page types to confidence scores
         """
-        text_content = f"{title} {content}".lower()
-        scores = {}
-        
-        for page_type in self.url_patterns.keys():
-            url_score = self._score_url_patterns(url, page_type)
-            content_score = self._score_content_keywords(text_content, page_type)
-            structured_score = self._score_structured_data(structured_data, page_type)
-            
-            total_score = (
-                url_score * 0.4 +
-                content_score * 0.5 +
-                structured_score * 0.1
-            )
-            
-            scores[page_type] = round(total_score, 3)
+        scores = self._score_all(url, title, content, structured_data)
         
-        return scores
\ No newline at end of file
+        return {page_type: round(score, 3) for page_type, score in scores.items()}
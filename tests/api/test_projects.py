@@ -10,8 +10,9 @@ from src.models.database import get_db, Base
 from src.models.project import User, Project
 from src.constants.business_categories import BUSINESS_CATEGORIES
 
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+# Create test database (one file per pytest-xdist worker)
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_DATABASE_URL = f"sqlite:///./test_{_XDIST_WORKER}.db" if _XDIST_WORKER else "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
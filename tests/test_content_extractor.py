@@ -8,7 +8,7 @@ from src.services.content_extractor import ContentExtractor
 class TestContentExtractor:
     """Test suite for ContentExtractor."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def extractor(self):
         """Create a content extractor instance for testing."""
         return ContentExtractor()
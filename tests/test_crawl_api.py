@@ -1,27 +1,60 @@
 """
 Integration tests for crawl API endpoints.
 """
+import os
 import pytest
 import json
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock, Mock
 from datetime import datetime, UTC
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 from main import app
-from src.models.database import SessionLocal, Base, engine
+from src.models.database import Base, get_db
 from src.models.project import User, Project
 from src.models.crawled_content import CrawlJob, CrawledPage
 
+pytestmark = pytest.mark.parallel_safe
+
+# Give each pytest-xdist worker its own database file
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///./test_{_XDIST_WORKER}.db" if _XDIST_WORKER else "sqlite:///./test.db"
+test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+
+def override_get_db():
+    """Override database dependency for testing."""
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
 # Create test client
 client = TestClient(app)
 
+@pytest.fixture(scope="module", autouse=True)
+def use_test_database():
+    """Point the API and background crawl jobs at the worker's test database."""
+    # Installed here rather than at import time so that other test modules'
+    # overrides, imported later during collection, don't replace it.
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    with patch('src.api.crawl.SessionLocal', TestingSessionLocal):
+        yield
+    if previous_override is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous_override
+
 @pytest.fixture(scope="function")
 def test_db():
     """Create a test database session."""
     # Create tables
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=test_engine)
     
-    db = SessionLocal()
+    db = TestingSessionLocal()
     try:
         # Create test user
         test_user = User(
@@ -44,7 +77,7 @@ def test_db():
     finally:
         db.close()
         # Clean up tables
-        Base.metadata.drop_all(bind=engine)
+        Base.metadata.drop_all(bind=test_engine)
 
 class TestCrawlAPI:
     """Test suite for crawl API endpoints."""
@@ -73,7 +106,7 @@ class TestCrawlAPI:
         assert "job_id" in data
         
         # Verify crawl job was created in database
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             crawl_job = db.query(CrawlJob).filter(CrawlJob.id == data["job_id"]).first()
             assert crawl_job is not None
@@ -98,7 +131,7 @@ class TestCrawlAPI:
         project_id = "test-project-id"
         
         # Create existing running crawl job
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             existing_job = CrawlJob(
                 project_id=project_id,
@@ -123,7 +156,7 @@ class TestCrawlAPI:
         project_id = "test-project-id"
         
         # Create crawl job
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             crawl_job = CrawlJob(
                 id="test-job-id",
@@ -167,7 +200,7 @@ class TestCrawlAPI:
         project_id = "test-project-id"
         
         # Create crawl job and pages
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             crawl_job = CrawlJob(
                 id="test-job-id",
@@ -240,7 +273,7 @@ class TestCrawlAPI:
         project_id = "test-project-id"
         
         # Create crawled pages of different types
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             crawl_job = CrawlJob(
                 id="test-job-id",
@@ -295,7 +328,7 @@ class TestCrawlAPI:
         project_id = "test-project-id"
         
         # Create multiple crawled pages
-        db = SessionLocal()
+        db = TestingSessionLocal()
         try:
             crawl_job = CrawlJob(
                 id="test-job-id",
@@ -373,10 +406,10 @@ class TestCrawlBackgroundTask:
     async def test_run_crawl_job_success(self):
         """Test successful background crawl job execution."""
         # Create test database
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=test_engine)
         
         try:
-            db = SessionLocal()
+            db = TestingSessionLocal()
             
             # Create test data
             test_user = User(id="test-user", email="test@example.com")
@@ -450,7 +483,7 @@ class TestCrawlBackgroundTask:
                 )
             
             # Verify job completion
-            db = SessionLocal()
+            db = TestingSessionLocal()
             try:
                 completed_job = db.query(CrawlJob).filter(CrawlJob.id == "test-job").first()
                 assert completed_job.status == "completed"
@@ -466,15 +499,15 @@ class TestCrawlBackgroundTask:
                 db.close()
         
         finally:
-            Base.metadata.drop_all(bind=engine)
+            Base.metadata.drop_all(bind=test_engine)
     
     @pytest.mark.asyncio
     async def test_run_crawl_job_failure(self):
         """Test background crawl job failure handling."""
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=test_engine)
         
         try:
-            db = SessionLocal()
+            db = TestingSessionLocal()
             
             # Create test data
             test_user = User(id="test-user", email="test@example.com")
@@ -513,7 +546,7 @@ class TestCrawlBackgroundTask:
                 )
             
             # Verify job failure
-            db = SessionLocal()
+            db = TestingSessionLocal()
             try:
                 failed_job = db.query(CrawlJob).filter(CrawlJob.id == "test-job").first()
                 assert failed_job.status == "failed"
@@ -522,7 +555,7 @@ class TestCrawlBackgroundTask:
                 db.close()
         
         finally:
-            Base.metadata.drop_all(bind=engine)
+            Base.metadata.drop_all(bind=test_engine)
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
@@ -3,20 +3,107 @@ Unit tests for the crawler service.
 """
 import pytest
 import asyncio
-from unittest.mock import Mock, AsyncMock, patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 import json
-from bs4 import BeautifulSoup
+from selectolax.lexbor import LexborHTMLParser
 
 from src.services.crawler_service import CrawlerService
 from src.services.content_extractor import ContentExtractor
 from src.services.page_classifier import PageClassifier
 
+pytestmark = pytest.mark.parallel_safe
+
+class _FakeResp:
+    """Minimal stand-in for an aiohttp response."""
+    
+    def __init__(self, text, status=200):
+        self._text = text
+        self.status = status
+    
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise Exception(f"HTTP {self.status}")
+    
+    async def text(self):
+        return self._text
+    
+    def release(self):
+        pass
+
+class _FakeSession:
+    """Minimal stand-in for aiohttp.ClientSession serving canned responses or errors by URL; other URLs get a 404."""
+    
+    def __init__(self, responses, connector=None, **kwargs):
+        self._responses = responses
+        self._connector = connector
+        self.requested = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        if self._connector is not None:
+            await self._connector.close()
+    
+    async def get(self, url, **kwargs):
+        self.requested.append(url)
+        r = self._responses.get(url, _FakeResp('', status=404))
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+class _StubRP:
+    """Minimal stand-in for urllib.robotparser.RobotFileParser."""
+    
+    def __init__(self, allow=True, raise_on_read=False):
+        self._allow = allow
+        self._raise = raise_on_read
+        self.url = None
+        self.reads = 0
+    
+    def set_url(self, url):
+        self.url = url
+    
+    def read(self):
+        self.reads += 1
+        if self._raise:
+            raise RuntimeError("robots.txt error")
+    
+    def can_fetch(self, *args):
+        return self._allow
+
+@pytest.fixture(scope="module")
+def mock_html():
+    """Sample HTML content for testing."""
+    return """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>Test Page</title>
+        <meta name="description" content="Test description">
+        <meta name="keywords" content="test, page">
+    </head>
+    <body>
+        <h1>Main Heading</h1>
+        <p>This is test content for the crawler.</p>
+        <a href="/about">About Us</a>
+        <a href="/products">Products</a>
+        <a href="https://external.com">External Link</a>
+    </body>
+    </html>
+    """
+
+@pytest.fixture(scope="module")
+def parsed_soup(mock_html):
+    """Parse mock_html once; tests must treat the tree as read-only."""
+    return LexborHTMLParser(mock_html)
+
 class TestCrawlerService:
     """Test suite for CrawlerService."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def crawler(self):
-        """Create a crawler instance for testing."""
+        """Create a crawler instance shared by the tests in this class."""
         return CrawlerService(
             max_pages=10,
             delay_seconds=0.1,  # Fast for tests
@@ -24,26 +111,21 @@ class TestCrawlerService:
             respect_robots=False  # Disable for tests
         )
     
-    @pytest.fixture
-    def mock_html(self):
-        """Sample HTML content for testing."""
-        return """
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Test Page</title>
-            <meta name="description" content="Test description">
-            <meta name="keywords" content="test, page">
-        </head>
-        <body>
-            <h1>Main Heading</h1>
-            <p>This is test content for the crawler.</p>
-            <a href="/about">About Us</a>
-            <a href="/products">Products</a>
-            <a href="https://external.com">External Link</a>
-        </body>
-        </html>
-        """
+    @pytest.fixture(autouse=True)
+    def reset_crawler_state(self, crawler):
+        """Reset the mutable crawl state of the shared crawler before each test."""
+        crawler.respect_robots = False
+        crawler.use_lexbor = True
+        crawler.crawled_urls.clear()
+        crawler.failed_urls.clear()
+        crawler.robots_cache.clear()
+        crawler._robots_locks.clear()
+    
+    @pytest.mark.parametrize("max_concurrency", [0, -1])
+    def test_rejects_non_positive_max_concurrency(self, max_concurrency):
+        """A crawler needs at least one request slot to make progress."""
+        with pytest.raises(ValueError):
+            CrawlerService(max_concurrency=max_concurrency)
     
     def test_normalize_url(self, crawler):
         """Test URL normalization."""
@@ -80,17 +162,13 @@ class TestCrawlerService:
         
         assert len(filtered) == 2
         assert all(url in filtered for url in expected)
+        
+        # First-seen order is preserved
+        assert filtered == expected
     
     @pytest.mark.asyncio
-    async def test_crawl_with_beautifulsoup_success(self, crawler, mock_html):
-        """Test successful crawling with BeautifulSoup."""
-        # Mock requests.Session
-        mock_session = Mock()
-        mock_response = Mock()
-        mock_response.text = mock_html
-        mock_response.raise_for_status.return_value = None
-        mock_session.get.return_value = mock_response
-        
+    async def test_crawl_static_success(self, crawler, mock_html):
+        """Test successful crawling with the static HTML fallback."""
         crawl_results = {
             'project_id': 'test-project',
             'base_url': 'https://example.com',
@@ -101,8 +179,9 @@ class TestCrawlerService:
             'failed_pages': []
         }
         
-        with patch('requests.Session', return_value=mock_session):
-            results = await crawler._crawl_with_beautifulsoup(
+        responses = {'https://example.com': _FakeResp(mock_html)}
+        with patch('aiohttp.ClientSession', lambda **kw: _FakeSession(responses, **kw)):
+            results = await crawler._crawl_static(
                 'https://example.com', 
                 'test-project', 
                 crawl_results,
@@ -112,17 +191,21 @@ class TestCrawlerService:
         assert results['pages_crawled'] == 1
         assert len(results['crawled_pages']) == 1
         
+        # Same-domain links are followed; the fake serves 404 for them
+        assert results['pages_failed'] == 2
+        assert {page['url'] for page in results['failed_pages']} == {
+            'https://example.com/about',
+            'https://example.com/products'
+        }
+        
         page = results['crawled_pages'][0]
         assert page['url'] == 'https://example.com'
         assert page['title'] == 'Test Page'
         assert page['status'] == 'crawled'
     
     @pytest.mark.asyncio
-    async def test_crawl_with_beautifulsoup_failure(self, crawler):
-        """Test crawling failure handling with BeautifulSoup."""
-        # Mock requests.Session to raise an exception
-        mock_session = Mock()
-        mock_session.get.side_effect = Exception("Network error")
+    async def test_crawl_static_failure(self, crawler):
+        """Test crawling failure handling with the static HTML fallback."""
         
         crawl_results = {
             'project_id': 'test-project',
@@ -134,8 +217,9 @@ class TestCrawlerService:
             'failed_pages': []
         }
         
-        with patch('requests.Session', return_value=mock_session):
-            results = await crawler._crawl_with_beautifulsoup(
+        responses = {'https://example.com': Exception("Network error")}
+        with patch('aiohttp.ClientSession', lambda **kw: _FakeSession(responses, **kw)):
+            results = await crawler._crawl_static(
                 'https://example.com',
                 'test-project',
                 crawl_results,
@@ -147,12 +231,11 @@ class TestCrawlerService:
         assert len(results['failed_pages']) == 1
         assert 'Network error' in results['failed_pages'][0]['error']
     
-    def test_extract_urls_from_soup(self, crawler, mock_html):
-        """Test URL extraction from BeautifulSoup."""
-        soup = BeautifulSoup(mock_html, 'html.parser')
+    def test_extract_urls_from_soup(self, crawler, parsed_soup):
+        """Test URL extraction from a parsed Lexbor tree."""
         base_url = "https://example.com"
         
-        urls = crawler._extract_urls_from_soup(soup, base_url)
+        urls = crawler._extract_urls_from_soup(parsed_soup, base_url)
         
         # Should extract relative URLs and convert to absolute
         expected_urls = [
@@ -163,6 +246,25 @@ class TestCrawlerService:
         assert len(urls) == 2
         assert all(url in urls for url in expected_urls)
     
+    @pytest.mark.parametrize("use_lexbor", [True, False])
+    def test_extract_urls_from_html(self, crawler, mock_html, use_lexbor):
+        """Test URL extraction from raw HTML with both Lexbor and lxml."""
+        crawler.use_lexbor = use_lexbor
+        base_url = "https://example.com"
+        
+        urls = crawler._extract_urls_from_html(mock_html, base_url)
+        
+        expected_urls = [
+            "https://example.com/about",
+            "https://example.com/products"
+        ]
+        
+        assert len(urls) == 2
+        assert all(url in urls for url in expected_urls)
+        
+        # Empty documents yield no links rather than raising
+        assert crawler._extract_urls_from_html("", base_url) == []
+    
     @pytest.mark.asyncio
     async def test_crawl_website_integration(self, crawler):
         """Test full website crawling integration."""
@@ -211,35 +313,53 @@ class TestCrawlerService:
         # Should always return True when robots.txt respect is disabled
         assert crawler._can_fetch_url("https://example.com/any-path") == True
     
-    def test_can_fetch_url_robots_enabled(self, crawler):
-        """Test robots.txt checking when enabled."""
+    @pytest.mark.parametrize("allow,raise_on_read,expected", [
+        (True, False, True),
+        (False, False, False),
+        (True, True, True),  # Unreadable robots.txt defaults to allowing
+    ])
+    def test_can_fetch_url_robots_enabled(self, crawler, allow, raise_on_read, expected):
+        """Test robots.txt checking when enabled, including read errors."""
         crawler.respect_robots = True
+        stub = _StubRP(allow=allow, raise_on_read=raise_on_read)
         
-        # Mock RobotFileParser
-        mock_robot_parser = Mock()
-        mock_robot_parser.can_fetch.return_value = True
-        
-        with patch('urllib.robotparser.RobotFileParser') as mock_rp_class:
-            mock_rp_class.return_value = mock_robot_parser
-            
+        with patch('src.services.crawler_service.RobotFileParser', lambda *args: stub):
             result = crawler._can_fetch_url("https://example.com/allowed-path")
-            
-            assert result == True
-            mock_robot_parser.set_url.assert_called_once()
-            mock_robot_parser.read.assert_called_once()
-            mock_robot_parser.can_fetch.assert_called_once()
+        
+        assert result == expected
+        assert stub.url == "https://example.com/robots.txt"
+        assert stub.reads == 1
     
-    def test_can_fetch_url_robots_error(self, crawler):
-        """Test robots.txt error handling."""
-        crawler.respect_robots = True
+    @pytest.mark.asyncio
+    async def test_can_fetch_url_async_caches_per_host(self, crawler):
+        """Test robots.txt is fetched once per host on the async path."""
+        session = _FakeSession({
+            "https://example.com/robots.txt": _FakeResp("User-agent: *\nDisallow: /private")
+        })
         
-        # Mock RobotFileParser to raise an exception
-        with patch('urllib.robotparser.RobotFileParser') as mock_rp_class:
-            mock_rp_class.return_value.read.side_effect = Exception("robots.txt error")
-            
-            # Should default to allowing crawling when robots.txt can't be read
-            result = crawler._can_fetch_url("https://example.com/path")
-            assert result == True
+        results = await asyncio.gather(
+            crawler._can_fetch_url_async(session, "https://example.com/public"),
+            crawler._can_fetch_url_async(session, "https://example.com/private/page"),
+            crawler._can_fetch_url_async(session, "https://example.com/about"),
+        )
+        
+        assert results == [True, False, True]
+        assert session.requested == ["https://example.com/robots.txt"]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("status, expected", [(404, True), (403, False), (503, False)])
+    async def test_can_fetch_url_async_robots_status(self, crawler, status, expected):
+        """Test robots.txt HTTP errors are handled like RobotFileParser.read()."""
+        session = _FakeSession({"https://example.com/robots.txt": _FakeResp("", status=status)})
+        
+        assert await crawler._can_fetch_url_async(session, "https://example.com/path") == expected
+    
+    @pytest.mark.asyncio
+    async def test_can_fetch_url_async_robots_error(self, crawler):
+        """Test the async robots.txt check defaults to allowing on fetch errors."""
+        session = _FakeSession({"https://example.com/robots.txt": Exception("robots.txt error")})
+        
+        assert await crawler._can_fetch_url_async(session, "https://example.com/path") == True
     
     @pytest.mark.asyncio
     async def test_progress_callback(self, crawler):
@@ -269,22 +389,21 @@ class TestCrawlerServiceEdgeCases:
     def crawler(self):
         return CrawlerService(max_pages=5, delay_seconds=0.1)
     
-    def test_invalid_base_url(self, crawler):
+    @pytest.mark.asyncio
+    async def test_invalid_base_url(self, crawler):
         """Test crawling with invalid base URL."""
         with pytest.raises(ValueError, match="Invalid URL"):
-            asyncio.run(crawler.crawl_website("project-id", "not-a-valid-url"))
+            await crawler.crawl_website("project-id", "not-a-valid-url")
     
-    def test_robots_disallowed_url(self, crawler):
+    @pytest.mark.asyncio
+    async def test_robots_disallowed_url(self, crawler):
         """Test crawling URL disallowed by robots.txt."""
         crawler.respect_robots = True
         
-        # Mock robots.txt to disallow crawling
-        mock_robot_parser = Mock()
-        mock_robot_parser.can_fetch.return_value = False
-        
-        with patch('urllib.robotparser.RobotFileParser', return_value=mock_robot_parser):
+        # Stub robots.txt to disallow crawling
+        with patch('src.services.crawler_service.RobotFileParser', lambda *args: _StubRP(allow=False)):
             with pytest.raises(ValueError, match="Robots.txt disallows crawling"):
-                asyncio.run(crawler.crawl_website("project-id", "https://example.com"))
+                await crawler.crawl_website("project-id", "https://example.com")
     
     @pytest.mark.asyncio
     async def test_max_pages_limit(self, crawler):
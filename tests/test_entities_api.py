@@ -1,24 +1,40 @@
 """
 Tests for entities API endpoints.
 """
+import os
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock, Mock
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert
 from sqlalchemy.orm import sessionmaker
 import json
 
 from main import app
+from src.api.entities import extraction_jobs
 from src.models.database import Base, get_db
 from src.models.project import Project, User
 from src.models.crawled_content import CrawledPage
 from src.models.entity import Entity
+from src.services.entity_service import EntityService
 
-# Create in-memory test database
-SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
+pytestmark = pytest.mark.parallel_safe
+
+# Give each pytest-xdist worker its own database file
+_XDIST_WORKER = os.environ.get("PYTEST_XDIST_WORKER")
+SQLALCHEMY_TEST_DATABASE_URL = f"sqlite:///./test_{_XDIST_WORKER}.db" if _XDIST_WORKER else "sqlite:///./test.db"
 test_engine = create_engine(SQLALCHEMY_TEST_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
 
+# pysqlite defers BEGIN on its own, which breaks SAVEPOINT-based rollback;
+# let SQLAlchemy emit BEGIN itself so each test can be wrapped in a transaction.
+@event.listens_for(test_engine, "connect")
+def _disable_pysqlite_begin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(test_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
 def override_get_db():
     """Override database dependency for testing."""
     try:
@@ -27,20 +43,30 @@ def override_get_db():
     finally:
         db.close()
 
-app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture(scope="session")
+def client():
+    """Share one TestClient, with the app lifespan entered once per session."""
+    with TestClient(app) as c:
+        yield c
 
-client = TestClient(app)
-
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="module")
 def db_setup():
     """Set up test database."""
+    # Installed here rather than at import time so that other test modules'
+    # overrides, imported later during collection, don't replace it.
+    previous_override = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
     Base.metadata.create_all(bind=test_engine)
     yield
     Base.metadata.drop_all(bind=test_engine)
+    if previous_override is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous_override
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def test_data(db_setup):
-    """Create test data."""
+    """Create test data once for the whole module."""
     db = TestingSessionLocal()
     
     # Create test user
@@ -90,8 +116,8 @@ def test_data(db_setup):
         )
     ]
     
-    for entity in entities:
-        db.add(entity)
+    db.flush()
+    db.bulk_save_objects(entities)
     
     db.commit()
     db.close()
@@ -103,11 +129,36 @@ def test_data(db_setup):
         "entities": entities
     }
 
+@pytest.fixture(autouse=True)
+def clear_extraction_jobs():
+    """Clear the in-process extraction job registry between tests."""
+    extraction_jobs.clear()
+    yield
+    extraction_jobs.clear()
+
+@pytest.fixture(autouse=True)
+def rollback_test_data(test_data):
+    """Run each test inside a transaction that is rolled back afterwards.
+
+    Sessions created by the API commit to a SAVEPOINT on the shared
+    connection, so tests such as ``test_delete_entities_success`` cannot
+    leak changes into the module-scoped ``test_data``.
+    """
+    connection = test_engine.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        yield
+    finally:
+        TestingSessionLocal.configure(bind=test_engine)
+        transaction.rollback()
+        connection.close()
+
 class TestEntitiesAPI:
     """Test cases for entities API endpoints."""
     
     @patch('src.api.entities.run_entity_extraction')
-    def test_extract_entities_success(self, mock_extract, test_data):
+    def test_extract_entities_success(self, mock_extract, client, test_data):
         """Test successful entity extraction initiation."""
         project_id = test_data["project_id"]
         
@@ -125,7 +176,7 @@ class TestEntitiesAPI:
         # Verify background task was called
         mock_extract.assert_called_once()
     
-    def test_extract_entities_project_not_found(self, test_data):
+    def test_extract_entities_project_not_found(self, client, test_data):
         """Test extraction with non-existent project."""
         response = client.post(
             "/api/entities/projects/nonexistent/extract",
@@ -135,7 +186,7 @@ class TestEntitiesAPI:
         assert response.status_code == 404
         assert "Project not found" in response.json()["detail"]
     
-    def test_extract_entities_invalid_confidence(self, test_data):
+    def test_extract_entities_invalid_confidence(self, client, test_data):
         """Test extraction with invalid confidence parameter."""
         project_id = test_data["project_id"]
         
@@ -153,7 +204,7 @@ class TestEntitiesAPI:
         )
         assert response.status_code == 422
     
-    def test_get_extraction_status_not_found(self, test_data):
+    def test_get_extraction_status_not_found(self, client, test_data):
         """Test getting status for non-existent job."""
         project_id = test_data["project_id"]
         
@@ -162,7 +213,7 @@ class TestEntitiesAPI:
         assert response.status_code == 404
         assert "No extraction jobs found" in response.json()["detail"]
     
-    def test_get_entities_success(self, test_data):
+    def test_get_entities_success(self, client, test_data):
         """Test successful entity retrieval."""
         project_id = test_data["project_id"]
         
@@ -183,7 +234,7 @@ class TestEntitiesAPI:
         for field in required_fields:
             assert field in entity
     
-    def test_get_entities_with_filters(self, test_data):
+    def test_get_entities_with_filters(self, client, test_data):
         """Test entity retrieval with filters."""
         project_id = test_data["project_id"]
         
@@ -196,7 +247,7 @@ class TestEntitiesAPI:
         for entity in data["entities"]:
             assert entity["type"] == "brand"
     
-    def test_get_entities_with_confidence_filter(self, test_data):
+    def test_get_entities_with_confidence_filter(self, client, test_data):
         """Test entity retrieval with confidence filter."""
         project_id = test_data["project_id"]
         
@@ -209,16 +260,36 @@ class TestEntitiesAPI:
         for entity in data["entities"]:
             assert entity["confidence_score"] >= 0.85
     
-    def test_get_entities_pagination(self, test_data):
+    def test_get_entities_pagination(self, client, test_data):
         """Test entity retrieval pagination."""
         project_id = test_data["project_id"]
         
+        # Add enough entities to span several pages (rolled back after the test)
+        db = TestingSessionLocal()
+        db.execute(insert(Entity), [
+            dict(
+                id=f"bulk_entity_{i}",
+                project_id=project_id,
+                page_id=test_data["page_id"],
+                entity_type="feature",
+                value=f"Feature {i}",
+                normalized_value=f"feature {i}",
+                confidence_score=0.5,
+                frequency=1,
+                extraction_method="regex_pattern"
+            )
+            for i in range(50)
+        ])
+        db.commit()
+        db.close()
+        
         # Test with limit
         response = client.get(f"/api/entities/projects/{project_id}?limit=1")
         assert response.status_code == 200
         data = response.json()
         
         assert data["limit"] == 1
+        assert data["total"] == 52
         assert len(data["entities"]) <= 1
         
         # Test with offset
@@ -226,15 +297,16 @@ class TestEntitiesAPI:
         assert response.status_code == 200
         data = response.json()
         assert data["offset"] == 1
+        assert len(data["entities"]) == 10
     
-    def test_get_entities_project_not_found(self, test_data):
+    def test_get_entities_project_not_found(self, client, test_data):
         """Test entity retrieval for non-existent project."""
         response = client.get("/api/entities/projects/nonexistent")
         
         assert response.status_code == 404
         assert "Project not found" in response.json()["detail"]
     
-    def test_get_entity_stats_success(self, test_data):
+    def test_get_entity_stats_success(self, client, test_data):
         """Test entity statistics retrieval."""
         project_id = test_data["project_id"]
         
@@ -251,14 +323,14 @@ class TestEntitiesAPI:
         assert data["project_id"] == project_id
         assert data["total_entities"] == 2
     
-    def test_get_entity_stats_project_not_found(self, test_data):
+    def test_get_entity_stats_project_not_found(self, client, test_data):
         """Test statistics for non-existent project."""
         response = client.get("/api/entities/projects/nonexistent/stats")
         
         assert response.status_code == 404
         assert "Project not found" in response.json()["detail"]
     
-    def test_delete_entities_success(self, test_data):
+    def test_delete_entities_success(self, client, test_data):
         """Test successful entity deletion."""
         project_id = test_data["project_id"]
         
@@ -274,7 +346,7 @@ class TestEntitiesAPI:
         get_data = get_response.json()
         assert get_data["total"] == 0
     
-    def test_delete_entities_project_not_found(self, test_data):
+    def test_delete_entities_project_not_found(self, client, test_data):
         """Test deletion for non-existent project."""
         response = client.delete("/api/entities/projects/nonexistent")
         
@@ -282,11 +354,59 @@ class TestEntitiesAPI:
         assert "Project not found" in response.json()["detail"]
 
 @pytest.mark.asyncio
+class TestEntityServiceStorage:
+    """Test cases for storing extraction results."""
+    
+    def test_store_entities_deduplicates_across_pages(self, test_data):
+        """Test an entity found on two pages in one run is stored once with frequency 2."""
+        project_id = test_data["project_id"]
+        service = EntityService()
+        db = TestingSessionLocal()
+        
+        try:
+            db.add(CrawledPage(
+                id="test_page_2",
+                project_id=project_id,
+                crawl_job_id="test_job",
+                url="https://example.com/page2",
+                normalized_url="https://example.com/page2",
+                status="crawled"
+            ))
+            
+            entity_cache = {}
+            stored = [
+                service._store_entities(db, {
+                    "project_id": project_id,
+                    "page_id": page_id,
+                    "entities": [{
+                        "value": "Acme Widgets",
+                        "normalized_value": "acme widgets",
+                        "entity_type": "brand",
+                        "confidence_score": 0.8,
+                        "context": "",
+                        "extraction_method": "spacy"
+                    }]
+                }, entity_cache)
+                for page_id in ("test_page", "test_page_2")
+            ]
+            db.commit()
+            
+            rows = db.query(Entity).filter(
+                Entity.project_id == project_id,
+                Entity.normalized_value == "acme widgets"
+            ).all()
+        finally:
+            db.close()
+        
+        assert stored == [1, 0]
+        assert len(rows) == 1
+        assert rows[0].frequency == 2
+
 class TestEntitiesAPIIntegration:
     """Integration tests for entities API workflow."""
     
     @patch('src.services.entity_service.EntityService.extract_and_store_entities')
-    async def test_full_extraction_workflow(self, mock_extract_service, test_data):
+    async def test_full_extraction_workflow(self, mock_extract_service, client, test_data):
         """Test complete extraction workflow."""
         project_id = test_data["project_id"]
         
@@ -310,7 +430,6 @@ class TestEntitiesAPIIntegration:
         job_id = job_data["job_id"]
         
         # Simulate job completion
-        from src.api.entities import extraction_jobs
         extraction_jobs[job_id] = {
             "project_id": project_id,
             "status": "completed",
@@ -332,7 +451,7 @@ class TestEntitiesAPIIntegration:
         assert status_data["status"] == "completed"
         assert status_data["entities_found"] == 5
     
-    def test_api_validation_edge_cases(self, test_data):
+    def test_api_validation_edge_cases(self, client, test_data):
         """Test API validation with edge cases."""
         project_id = test_data["project_id"]
         
@@ -350,7 +469,7 @@ class TestEntitiesAPIIntegration:
         data = response.json()
         assert data["total"] == 0
     
-    def test_concurrent_extraction_requests(self, test_data):
+    def test_concurrent_extraction_requests(self, client, test_data):
         """Test handling of concurrent extraction requests."""
         project_id = test_data["project_id"]
         
@@ -372,7 +491,7 @@ class TestEntitiesAPIIntegration:
             # May return already running status or start new job depending on timing
             assert response2.status_code == 200
     
-    def test_api_error_handling(self, test_data):
+    def test_api_error_handling(self, client, test_data):
         """Test API error handling and response formats."""
         # Test malformed JSON
         project_id = test_data["project_id"]
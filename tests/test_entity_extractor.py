@@ -3,10 +3,12 @@ Tests for entity extraction service.
 """
 import pytest
 import asyncio
-from unittest.mock import Mock, patch, AsyncMock
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, MagicMock, patch, AsyncMock
 from typing import Dict, Any
 
-from src.services.entity_extractor import EntityExtractor
+from src.services.entity_extractor import EntityExtractor, EntityRecord, _get_nlp
 from src.services.nlp_processor import NLPProcessor
 from src.utils.entity_patterns import EntityPatterns
 from tests.fixtures.sample_business_content import BusinessContentFixtures
@@ -139,6 +141,66 @@ class TestEntityExtractor:
                 assert result["entities_found"] == 0
                 assert isinstance(result["entities"], list)
     
+    async def test_extract_entities_fast_mode_skips_spacy(self, entity_extractor, business_content):
+        """Test fast mode extracts with regex patterns without loading spaCy."""
+        content = business_content.get_ecommerce_content()
+        
+        with patch.object(entity_extractor, '_load_spacy_model', new_callable=AsyncMock) as mock_load:
+            result = await entity_extractor.extract_entities_from_page(
+                project_id="test_project",
+                page_id="test_page",
+                page_content=content,
+                min_confidence=0.5,
+                mode="fast"
+            )
+        
+        mock_load.assert_not_called()
+        assert result["error"] is None
+        assert result["extraction_method"] == "regex"
+        assert result["entities_found"] > 0
+        assert all(e["extraction_method"] == "regex_pattern" for e in result["entities"])
+    
+    def test_load_model_disables_unused_pipes(self, entity_extractor):
+        """Test spaCy is loaded with components we don't use disabled."""
+        mock_nlp = MagicMock(pipe_names=["tok2vec", "ner"])
+        
+        _get_nlp.cache_clear()
+        with patch('src.services.entity_extractor.spacy.load', return_value=mock_nlp) as mock_load:
+            nlp = entity_extractor._load_model_sync()
+            # A second extractor reuses the cached model
+            EntityExtractor()._load_model_sync()
+        _get_nlp.cache_clear()
+        
+        assert nlp is mock_nlp
+        mock_load.assert_called_once_with(
+            "en_core_web_lg",
+            disable=["tagger", "parser", "lemmatizer", "attribute_ruler"]
+        )
+    
+    def test_load_model_concurrent_cold_start(self, entity_extractor):
+        """Test concurrent first loads share one spaCy load and one EntityRuler."""
+        mock_nlp = MagicMock(pipe_names=["tok2vec", "ner"])
+        
+        def add_pipe(*args, **kwargs):
+            mock_nlp.pipe_names.append("entity_ruler")
+            return MagicMock()
+        
+        mock_nlp.add_pipe.side_effect = add_pipe
+        
+        def slow_load(*args, **kwargs):
+            time.sleep(0.05)
+            return mock_nlp
+        
+        _get_nlp.cache_clear()
+        with patch('src.services.entity_extractor.spacy.load', side_effect=slow_load) as mock_load:
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                models = list(pool.map(lambda _: entity_extractor._load_model_sync(), range(4)))
+        _get_nlp.cache_clear()
+        
+        assert all(nlp is mock_nlp for nlp in models)
+        mock_load.assert_called_once()
+        mock_nlp.add_pipe.assert_called_once()
+    
     def test_map_spacy_label_to_business_type(self, entity_extractor):
         """Test spaCy label mapping to business entity types."""
         # Test mappings
@@ -184,35 +246,36 @@ class TestEntityExtractor:
     def test_deduplicate_entities(self, entity_extractor):
         """Test entity deduplication logic."""
         entities = [
-            {
-                "value": "TechCorp Solutions",
-                "normalized_value": "techcorp solutions", 
-                "entity_type": "brand",
-                "confidence_score": 0.8
-            },
-            {
-                "value": "TechCorp Solutions Inc.",
-                "normalized_value": "techcorp solutions",
-                "entity_type": "brand", 
-                "confidence_score": 0.9
-            },
-            {
-                "value": "Different Company",
-                "normalized_value": "different company",
-                "entity_type": "brand",
-                "confidence_score": 0.7
-            }
+            EntityRecord("TechCorp Solutions", "techcorp solutions", "brand", 0.8, "", "spacy_ner", None),
+            EntityRecord("TechCorp Solutions Inc.", "techcorp solutions", "brand", 0.9, "", "spacy_ner", None),
+            EntityRecord("Different Company", "different company", "brand", 0.7, "", "spacy_ner", None),
         ]
         
-        deduplicated = entity_extractor._deduplicate_entities(entities)
+        deduplicated = entity_extractor._deduplicate_records(entities)
         
         # Should keep higher confidence entity and unique entity
         assert len(deduplicated) == 2
         
         # Should keep the higher confidence TechCorp entity
-        techcorp_entities = [e for e in deduplicated if "techcorp" in e["normalized_value"]]
+        techcorp_entities = [e for e in deduplicated if "techcorp" in e.normalized_value]
         assert len(techcorp_entities) == 1
-        assert techcorp_entities[0]["confidence_score"] == 0.9
+        assert techcorp_entities[0].confidence_score == 0.9
+
+    def test_deduplicate_records(self, entity_extractor):
+        """Test record deduplication keeps the most confident record and converts to dicts."""
+        records = [
+            EntityRecord("TechCorp", "techcorp", "brand", 0.8, "", "spacy_ner", "p1"),
+            EntityRecord("TechCorp Inc.", "techcorp", "brand", 0.9, "", "regex_pattern", "p1"),
+            EntityRecord("TechCorp", "techcorp", "product", 0.7, "", "spacy_ner", "p1"),
+        ]
+        
+        deduplicated = entity_extractor._deduplicate_records(records)
+        
+        assert len(deduplicated) == 2
+        brand = deduplicated[0].to_dict()
+        assert brand["value"] == "TechCorp Inc."
+        assert brand["confidence_score"] == 0.9
+        assert brand["page_id"] == "p1"
 
 @pytest.mark.asyncio
 class TestEntityExtractionIntegration:
@@ -241,7 +304,9 @@ class TestEntityExtractionIntegration:
                         mock_doc.ents = []
                     return mock_doc
                 
-                mock_nlp.side_effect = mock_nlp_call
+                mock_nlp.pipe.side_effect = lambda texts, **kwargs: iter(
+                    [mock_nlp_call(text) for text in texts]
+                )
                 
                 results = await entity_extractor.extract_entities_from_project(
                     project_id="multi_page_test",
@@ -250,6 +315,8 @@ class TestEntityExtractionIntegration:
                 )
                 
                 assert len(results) == 3
+                mock_nlp.pipe.assert_called_once()
+                mock_nlp.assert_not_called()
                 
                 # Each page should have extraction results
                 for result in results:
@@ -257,6 +324,17 @@ class TestEntityExtractionIntegration:
                     assert result["error"] is None
                     assert "entities_found" in result
     
+    async def test_extract_entities_from_project_rejects_zero_concurrency(self, entity_extractor, business_content):
+        """Test a non-positive concurrency limit is rejected instead of hanging."""
+        pages = [business_content.get_ecommerce_content()]
+        
+        with pytest.raises(ValueError):
+            await entity_extractor.extract_entities_from_project(
+                project_id="test_project",
+                pages=pages,
+                max_concurrency=0
+            )
+    
     async def test_handle_extraction_errors(self, entity_extractor, business_content):
         """Test error handling during entity extraction."""
         content = business_content.get_ecommerce_content()
@@ -1,11 +1,13 @@
 """
 Tests for NLP processor and text processing utilities.
 """
+import html
 import pytest
-from src.services.nlp_processor import NLPProcessor
+from unittest.mock import patch
+from src.services.nlp_processor import NLPProcessor, _structured_data_text, _unescape
 from tests.fixtures.sample_business_content import BusinessContentFixtures
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def nlp_processor():
     """Create NLP processor instance for testing."""
     return NLPProcessor()
@@ -62,6 +64,35 @@ class TestNLPProcessor:
         assert "Home About Contact" not in cleaned or len(cleaned) < len(text)
         assert "great product line" in cleaned
     
+    @pytest.mark.parametrize("text, expected, uses_fallback", [
+        ("AT&T", "AT&T", True),
+        ("&amp;lt;", "&lt;", False),
+        ("&nbsp;", "\xa0", False),
+        ("Caf&eacute; menu", "Caf\u00e9 menu", True),
+    ])
+    def test_unescape(self, text, expected, uses_fallback):
+        """Test the common-entity fast path matches html.unescape and defers other entities to it."""
+        with patch('src.services.nlp_processor.html.unescape', wraps=html.unescape) as mock_unescape:
+            assert _unescape(text) == expected
+        
+        assert expected == html.unescape(text)
+        assert mock_unescape.called == uses_fallback
+    
+    @pytest.mark.parametrize("text, expected", [
+        ("<b>Acme</b> widgets for x<y ranges", "Acme widgets for x<y ranges"),
+        ("Plans for teams &lt;Enterprise tier coming soon", "Plans for teams <Enterprise tier coming soon"),
+        ("Tom &amp;amp; Jerry", "Tom &amp; Jerry"),
+        ("<p>Tom &amp;amp; Jerry</p>", "Tom &amp; Jerry"),
+    ])
+    def test_clean_text_keeps_stray_angle_brackets(self, nlp_processor, text, expected):
+        """Test stray '<' survives tag stripping and entities are decoded exactly once."""
+        assert nlp_processor.clean_text(text) == expected
+    
+    @pytest.mark.parametrize("text", ["Home", " Home", "  Home<p>", "<li>\n  Home\n</li>"])
+    def test_clean_text_navigation_only(self, nlp_processor, text):
+        """Test navigation-only text is dropped regardless of surrounding whitespace or markup."""
+        assert nlp_processor.clean_text(text) == ""
+    
     def test_segment_content_complete(self, nlp_processor, business_content):
         """Test content segmentation with complete page content."""
         content = business_content.get_ecommerce_content()
@@ -151,6 +182,40 @@ class TestNLPProcessor:
         # Should include price information
         assert "99.00" in text
     
+    def test_extract_structured_data_text_from_json_string(self, nlp_processor):
+        """Test JSON-LD given as a string or bytes matches the parsed dict path."""
+        structured_data = {
+            "@type": "Organization",
+            "name": "Acme Widgets",
+            "description": "Industrial widget maker"
+        }
+        raw = '{"@type": "Organization", "name": "Acme Widgets", "description": "Industrial widget maker"}'
+        
+        expected = nlp_processor._extract_structured_data_text(structured_data)
+        
+        assert "Acme Widgets" in expected
+        assert nlp_processor._extract_structured_data_text(raw) == expected
+        assert nlp_processor._extract_structured_data_text(raw.encode()) == expected
+    
+    def test_extract_structured_data_text_invalid_json_string(self, nlp_processor):
+        """Test malformed JSON-LD strings are tolerated rather than raising."""
+        assert isinstance(nlp_processor._extract_structured_data_text('{"name": "Acme'), str)
+        assert isinstance(nlp_processor._extract_structured_data_text(b'{"name": "Acme'), str)
+    
+    def test_extract_structured_data_text_cached(self, nlp_processor):
+        """Test a repeated structured data block is served from the cache with identical output."""
+        structured_data = {"@type": "Product", "name": "Cached Gadget", "brand": {"name": "Acme"}}
+        
+        _structured_data_text.cache_clear()
+        first = nlp_processor._extract_structured_data_text(structured_data)
+        second = nlp_processor._extract_structured_data_text(dict(structured_data))
+        cache_info = _structured_data_text.cache_info()
+        
+        assert first == second
+        assert "Cached Gadget" in first
+        assert cache_info.misses == 1
+        assert cache_info.hits == 1
+    
     def test_filter_noise_entities(self, nlp_processor):
         """Test entity noise filtering."""
         entities = [
@@ -2,12 +2,13 @@
 Unit tests for the page classifier service.
 """
 import pytest
+from unittest.mock import patch
 from src.services.page_classifier import PageClassifier
 
 class TestPageClassifier:
     """Test suite for PageClassifier."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def classifier(self):
         """Create a page classifier instance for testing."""
         return PageClassifier()
@@ -302,6 +303,21 @@ class TestPageClassifier:
         assert confidence >= 0.0  # At least some confidence
         # Strong product keywords should classify as product
         assert page_type in ["product", "unknown"]  # Accept either for this minimal test
+    
+    def test_classify_page_caches_repeat_pages(self):
+        """Test that classifying an identical page again reuses the cached result."""
+        classifier = PageClassifier()
+        url = "https://example.com/products/widget-123"
+        content = "Add to cart now. In stock with free shipping."
+        
+        with patch.object(classifier, '_classify_page_uncached',
+                          wraps=classifier._classify_page_uncached) as mock_classify:
+            first = classifier.classify_page(url, "Widget", content)
+            second = classifier.classify_page(url, "Widget", content)
+            classifier.classify_page(url, "Widget", content + " Buy now.")
+        
+        assert first == second
+        assert mock_classify.call_count == 2
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
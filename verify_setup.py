@@ -4,11 +4,31 @@ Script to verify the setup is complete and working
 """
 import sys
 import os
-import importlib.util
+import ast
+import pathlib
 
-def check_file_exists(filepath, description):
+def list_directory_entries(filepaths):
+    """List each parent directory once instead of stat-ing every file"""
+    entries = {}
+    for filepath in filepaths:
+        directory = os.path.dirname(filepath) or "."
+        if directory not in entries:
+            try:
+                with os.scandir(directory) as it:
+                    entries[directory] = {entry.name for entry in it}
+            except OSError:
+                entries[directory] = set()
+    return entries
+
+def check_file_exists(filepath, description, directory_entries=None):
     """Check if a file exists"""
-    if os.path.exists(filepath):
+    if directory_entries is None:
+        exists = os.path.exists(filepath)
+    else:
+        directory = os.path.dirname(filepath) or "."
+        exists = os.path.basename(filepath) in directory_entries.get(directory, set())
+    
+    if exists:
         print(f"✅ {description}: {filepath}")
         return True
     else:
@@ -16,14 +36,12 @@ def check_file_exists(filepath, description):
         return False
 
 def check_python_module(module_path, description):
-    """Check if a Python module can be imported"""
+    """Check if a Python module parses, without compiling or running it"""
     try:
-        spec = importlib.util.spec_from_file_location("test_module", module_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        ast.parse(pathlib.Path(module_path).read_text(encoding="utf-8"), filename=module_path)
         print(f"✅ {description}: {module_path}")
         return True
-    except Exception as e:
+    except (SyntaxError, ValueError, OSError) as e:
         print(f"❌ {description}: {module_path} - ERROR: {e}")
         return False
 
@@ -47,8 +65,9 @@ def main():
         ("README.md", "Project documentation"),
     ]
     
+    directory_entries = list_directory_entries(filepath for filepath, _ in files_to_check)
     for filepath, description in files_to_check:
-        if not check_file_exists(filepath, description):
+        if not check_file_exists(filepath, description, directory_entries):
             all_good = False
     
     print("\n🐍 Checking Python modules...")